@@ -1,30 +1,112 @@
 # http://www.schulentwicklung.nrw.de/angebote/materialdatenbank/upload/4674/143093_E_S1_AB1_Differenz_trifft.pdf
 
 import random
-import statistics
 import bisect
+import functools
+
+import numpy as np
 
 """Start vector from which the script starts improving."""
 START_VECTOR = [3, 3, 3, 3, 3, 3]
 
 """The number of sets to be computed in one series."""
-SETS_PER_SERIES = 1000
+SETS_PER_SERIES = 100000
+
+"""The seed of the throws and of the order in which vectors are tried. Every vector gets the same throws."""
+SEED = 0
+
+"""Whether vectors are ranked by the exact statistics of their sets instead of simulated series."""
+EXACT = True
+
+"""The probability of each difference of 2 dices: 6/36 for 0, 2(6 - k)/36 for k > 0."""
+PROBABILITIES = [sum(abs(a - b) == k for a in range(6) for b in range(6)) / 36 for k in range(6)]
 
 # all results that we generate 
 results = []
 
-# an unlimited series of throws
-# each throw is a difference of 2 dices
-throws = []
+# The throws are counted for all 6 fields at once: the count of each field is a byte of one integer,
+# and a throw adds 1 to the byte of the field it hits. The integers of the 36 throws of 2 dices:
+HITS = np.array([1 << 8 * abs(a - b) for a in range(6) for b in range(6)], dtype=np.uint64)
+SHIFTS = np.array([8 * field for field in range(6)], dtype=np.uint64)
+
+# A field's byte starts at 128 minus the chips left on the field, so its high bit is set as soon as
+# the field is empty. A block of at most 127 throws can't overflow into the next byte.
+EMPTY = np.uint64(sum(0x80 << 8 * field for field in range(6)))
+MAX_BLOCK = 127
+
+def simulate(vector, sets, rng):
+	"""Simulates the sets of a series at once and returns the number of throws of each set as an array."""
+	series = np.zeros(sets, dtype=np.int64)
+
+	# the sets not yet completed and the chips left on their fields
+	pending = np.arange(sets if any(vector) else 0)
+	left = np.tile(np.array(vector, dtype=np.uint64)[:, None], sets)
+
+	# one column of throws per set, thrown in blocks. Most sets are completed after the first block,
+	# which is twice the number of chips. The others get another block until they are.
+	block = min(2 * sum(vector) + 1, MAX_BLOCK)
+	while len(pending) > 0:
+		counts = HITS[rng.integers(0, 36, (block, len(pending)), dtype=np.int8)]
+		counts[0] += ((128 - left) << SHIFTS[:, None]).sum(axis=0)
+		np.cumsum(counts, axis=0, out=counts)
+		last = counts[-1].copy()
+
+		# the set is completed with the first throw after which all fields are empty
+		empty = np.bitwise_and(counts, EMPTY, out=counts) == EMPTY
+		completed = empty[-1]
+		series[pending] += np.where(completed, block + 1 - empty.sum(axis=0), block)
 
-def gen_throws():
-	"""Generates the throws. Every vector gets the same throws."""
-	i = 0
-	while True:
-		if i >= len(throws):
-			throws.append(abs(random.randint(1, 6) - random.randint(1, 6)))
-		yield throws[i]
-		i += 1
+		# the chips left after the block
+		last = last[~completed]
+		left = 128 - np.minimum((last >> SHIFTS[:, None]) & np.uint64(0xFF), 128)
+		pending = pending[~completed]
+	return series
+
+@functools.lru_cache(maxsize=None)
+def moments(left):
+	"""Returns the expected number of throws to complete a set and its second moment, with the chips left as a tuple.
+	The results are shared by all vectors, as they pass through the same states."""
+
+	# the throws until one hits a field with chips left are geometrically distributed
+	hit = sum(p for p, n in zip(PROBABILITIES, left) if n > 0)
+	if hit == 0:
+		return 0.0, 0.0
+	mean = 1 / hit
+	second = (2 - hit) / hit ** 2
+
+	# then the set goes on from one chip less on the field hit, independent of how long that took
+	rest_mean = rest_second = 0.0
+	for field, n in enumerate(left):
+		if n > 0:
+			m, s = moments(left[:field] + (n - 1,) + left[field + 1:])
+			rest_mean += PROBABILITIES[field] / hit * m
+			rest_second += PROBABILITIES[field] / hit * s
+	return mean + rest_mean, second + 2 * mean * rest_mean + rest_second
+
+def median_throws(vector):
+	"""Returns the median number of throws to complete a set, following the distribution of the chips left throw by throw."""
+
+	# the probability of each number of chips left, one axis per field. The first entry is the completed set.
+	chances = np.zeros([n + 1 for n in vector])
+	chances[tuple(vector)] = 1.0
+	throws = 0
+	while chances.flat[0] < 0.5:
+		after = np.zeros_like(chances)
+		for field, p in enumerate(PROBABILITIES):
+			before, now = np.moveaxis(chances, field, 0), np.moveaxis(after, field, 0)
+
+			# a hit takes a chip from the field, if there is one left
+			now[:-1] += p * before[1:]
+			now[0] += p * before[0]
+		chances = after
+		throws += 1
+	return throws
+
+def exact_statistics(vector):
+	"""Returns the mean, the median and the standard deviation of the number of throws to complete a set.
+	They are rounded, so that vectors with the same distribution tie (0 and 3 are equally likely)."""
+	mean, second = moments(tuple(vector))
+	return round(mean, 9), float(median_throws(vector)), round(max(second - mean ** 2, 0.0) ** 0.5, 9)
 
 def gen_vectors():
 	"""Generates new vectors by altering two coordinates of the best one we found so far."""	
@@ -36,7 +118,7 @@ def gen_vectors():
 
 	# init modifiers 
 	modifiers = [(a, b) for a in range(6) for b in range(6) if a != b]
-	random.shuffle(modifiers)
+	random.Random(SEED).shuffle(modifiers)
 
 	# loop while still vectors to be tried
 	counter = 0
@@ -62,28 +144,24 @@ def gen_vectors():
 
 def main():
 	""" generates series and stores them in the results list."""
-	print("Running the script with start vector {!s} and {!s} sets per series.".format(START_VECTOR, SETS_PER_SERIES))
+	if EXACT:
+		print("Running the script with start vector {!s} and exact statistics.".format(START_VECTOR))
+	else:
+		print("Running the script with start vector {!s} and {!s} sets per series.".format(START_VECTOR, SETS_PER_SERIES))
 
 	# repeat while still vectors to be checked
 	for vector in gen_vectors():
 
-		# prepare for the new series
-		series = []
-		throws = gen_throws()
-
-		# create the sets for this series
-		for _ in range(SETS_PER_SERIES):
-			copy_of_vector = list(vector)
-			while any(n > 0 for n in copy_of_vector):
-				copy_of_vector[next(throws)] -= 1
-
-			# one set completed. Add number of throws to series.
-			series.append(sum(vector) - sum(copy_of_vector))
+		# the statistics are either computed from the probabilities of the throws or from a simulated series
+		if EXACT:
+			mean, median, standard_deviation = exact_statistics(vector)
+		else:
+			series = simulate(vector, SETS_PER_SERIES, np.random.default_rng(SEED))
+			mean = float(series.mean())
+			median = float(np.median(series))
+			standard_deviation = float(series.std(ddof=1))
 
-		# append series to the results
-		mean = sum(series, 0.0) / len(series)
-		median = statistics.median(series)
-		standard_deviation = statistics.stdev(series)
+		# append the statistics to the results
 		bisect.insort(results, (mean, median, vector, standard_deviation))
 		print('.', end = '', flush = True)
 
@@ -96,90 +174,103 @@ if __name__ == "__main__":
 	main()
 
 """
-Running the script with start vector [3, 3, 3, 3, 3, 3] and 1000 sets per series.
-..................................................................................
+Running the script with start vector [3, 3, 3, 3, 3, 3] and exact statistics.
+................................................................................................
 Results in ascending order, sorted by average number of throws per set
-Vector: [3, 6, 5, 3, 1, 0], Means: 31.445, Median: 30.0, Standard Deviation: 8.013188265989148
-Vector: [2, 6, 5, 3, 2, 0], Means: 31.978, Median: 30.0, Standard Deviation: 8.086959559371799
-Vector: [3, 6, 4, 3, 2, 0], Means: 31.978, Median: 30.0, Standard Deviation: 8.591468403557645
-Vector: [2, 7, 5, 3, 1, 0], Means: 31.978, Median: 31.0, Standard Deviation: 7.7407645252543
-Vector: [3, 6, 5, 2, 2, 0], Means: 32.09, Median: 30.0, Standard Deviation: 8.520240283847311
-Vector: [3, 5, 5, 3, 2, 0], Means: 32.22, Median: 30.0, Standard Deviation: 8.639690054871428
-Vector: [2, 6, 6, 3, 1, 0], Means: 32.297, Median: 31.0, Standard Deviation: 8.16587242567948
-Vector: [3, 6, 4, 4, 1, 0], Means: 32.327, Median: 30.0, Standard Deviation: 8.848184071399135
-Vector: [2, 6, 5, 4, 1, 0], Means: 32.347, Median: 31.0, Standard Deviation: 8.62966175826504
-Vector: [2, 7, 4, 3, 2, 0], Means: 32.409, Median: 31.0, Standard Deviation: 8.234532562721853
-Vector: [2, 7, 5, 2, 2, 0], Means: 32.488, Median: 31.0, Standard Deviation: 7.919885136829989
-Vector: [2, 6, 4, 4, 2, 0], Means: 32.645, Median: 31.0, Standard Deviation: 8.914058303345083
-Vector: [2, 6, 6, 2, 2, 0], Means: 32.727, Median: 31.0, Standard Deviation: 8.384077991273921
-Vector: [3, 7, 3, 3, 2, 0], Means: 32.763, Median: 31.0, Standard Deviation: 8.267356299336576
-Vector: [3, 5, 4, 4, 2, 0], Means: 32.847, Median: 31.0, Standard Deviation: 9.323117049115682
-Vector: [1, 7, 5, 3, 2, 0], Means: 33.014, Median: 31.0, Standard Deviation: 8.247898631277655
-Vector: [2, 5, 6, 3, 2, 0], Means: 33.075, Median: 31.0, Standard Deviation: 8.959109366485077
-Vector: [3, 6, 3, 4, 2, 0], Means: 33.099, Median: 31.0, Standard Deviation: 9.194113917650288
-Vector: [2, 5, 5, 4, 2, 0], Means: 33.171, Median: 31.0, Standard Deviation: 9.452465715785914
-Vector: [1, 6, 6, 3, 2, 0], Means: 33.274, Median: 32.0, Standard Deviation: 8.584207162726946
-Vector: [1, 6, 5, 4, 2, 0], Means: 33.407, Median: 31.0, Standard Deviation: 9.099678849011934
-Vector: [2, 6, 4, 3, 3, 0], Means: 34.318, Median: 32.0, Standard Deviation: 10.446722452999794
-Vector: [3, 6, 4, 3, 1, 1], Means: 34.652, Median: 31.0, Standard Deviation: 13.973122204580626
-Vector: [2, 6, 5, 2, 3, 0], Means: 34.685, Median: 32.0, Standard Deviation: 10.46868513082557
-Vector: [2, 5, 5, 3, 3, 0], Means: 34.77, Median: 32.0, Standard Deviation: 10.816658453519743
-Vector: [2, 6, 5, 3, 1, 1], Means: 34.846, Median: 31.0, Standard Deviation: 13.677403092522912
-Vector: [3, 5, 4, 5, 1, 0], Means: 34.884, Median: 33.0, Standard Deviation: 10.59380822805344
-Vector: [2, 6, 5, 2, 2, 1], Means: 34.996, Median: 31.0, Standard Deviation: 13.9012671807008
-Vector: [2, 6, 4, 3, 2, 1], Means: 35.044, Median: 31.0, Standard Deviation: 14.264415078703282
-Vector: [1, 6, 5, 3, 3, 0], Means: 35.048, Median: 32.0, Standard Deviation: 10.642883395347662
-Vector: [2, 5, 4, 5, 2, 0], Means: 35.129, Median: 33.0, Standard Deviation: 10.40310451661347
-Vector: [2, 5, 4, 4, 3, 0], Means: 35.252, Median: 33.0, Standard Deviation: 11.09448437664336
-Vector: [2, 5, 5, 3, 2, 1], Means: 35.278, Median: 31.0, Standard Deviation: 14.12962711335166
-Vector: [3, 5, 3, 5, 2, 0], Means: 35.494, Median: 33.0, Standard Deviation: 10.576759041967055
-Vector: [3, 4, 4, 5, 2, 0], Means: 35.576, Median: 34.0, Standard Deviation: 10.628319960613963
-Vector: [3, 5, 4, 4, 1, 1], Means: 35.597, Median: 32.0, Standard Deviation: 14.45931058739187
-Vector: [3, 4, 4, 4, 3, 0], Means: 35.619, Median: 33.0, Standard Deviation: 11.248215919040733
-Vector: [3, 5, 3, 4, 3, 0], Means: 35.619, Median: 33.0, Standard Deviation: 11.380833113720733
-Vector: [1, 6, 5, 3, 2, 1], Means: 35.627, Median: 32.0, Standard Deviation: 13.930826929473316
-Vector: [3, 6, 2, 5, 2, 0], Means: 35.834, Median: 33.0, Standard Deviation: 10.440088095386908
-Vector: [2, 5, 3, 5, 3, 0], Means: 37.742, Median: 35.0, Standard Deviation: 11.960036725632513
-Vector: [3, 5, 3, 5, 1, 1], Means: 37.896, Median: 34.0, Standard Deviation: 14.23452864712442
-Vector: [3, 4, 3, 5, 3, 0], Means: 38.187, Median: 36.0, Standard Deviation: 12.17588942473129
-Vector: [3, 5, 2, 5, 3, 0], Means: 38.277, Median: 36.0, Standard Deviation: 11.971950492655681
-Vector: [3, 5, 3, 6, 1, 0], Means: 38.734, Median: 37.0, Standard Deviation: 12.019638751464859
-Vector: [3, 4, 3, 5, 2, 1], Means: 38.814, Median: 35.0, Standard Deviation: 14.353725420023661
-Vector: [2, 5, 3, 6, 2, 0], Means: 39.117, Median: 36.0, Standard Deviation: 12.128743439343475
-Vector: [3, 4, 3, 6, 2, 0], Means: 39.543, Median: 37.0, Standard Deviation: 12.128695571093218
-Vector: [3, 5, 2, 6, 2, 0], Means: 39.606, Median: 37.0, Standard Deviation: 12.0142043059499
-Vector: [2, 4, 3, 6, 3, 0], Means: 41.198, Median: 39.0, Standard Deviation: 12.99514023278201
-Vector: [3, 4, 2, 6, 3, 0], Means: 41.715, Median: 39.0, Standard Deviation: 12.76937084714168
-Vector: [3, 5, 1, 6, 3, 0], Means: 41.875, Median: 39.0, Standard Deviation: 12.484840657623398
-Vector: [2, 4, 3, 5, 4, 0], Means: 42.302, Median: 40.0, Standard Deviation: 14.161049796230904
-Vector: [3, 4, 2, 6, 2, 1], Means: 42.48, Median: 40.0, Standard Deviation: 14.363074110297486
-Vector: [3, 5, 1, 6, 2, 1], Means: 42.718, Median: 40.0, Standard Deviation: 14.423054478871682
-Vector: [2, 4, 2, 6, 3, 1], Means: 43.921, Median: 41.0, Standard Deviation: 15.196041546359323
-Vector: [3, 4, 2, 7, 2, 0], Means: 44.328, Median: 42.0, Standard Deviation: 13.485929196250671
-Vector: [2, 4, 2, 6, 4, 0], Means: 45.041, Median: 43.0, Standard Deviation: 14.29894327489898
-Vector: [2, 4, 2, 7, 3, 0], Means: 45.509, Median: 43.0, Standard Deviation: 13.899680576190235
-Vector: [3, 4, 1, 7, 3, 0], Means: 46.03, Median: 44.0, Standard Deviation: 13.798967769783054
-Vector: [3, 4, 2, 5, 2, 2], Means: 46.342, Median: 40.0, Standard Deviation: 20.627567295552147
-Vector: [2, 4, 2, 7, 2, 1], Means: 46.441, Median: 44.0, Standard Deviation: 16.21201247064498
-Vector: [3, 3, 3, 5, 2, 2], Means: 46.449, Median: 41.0, Standard Deviation: 20.659676212884392
-Vector: [3, 4, 2, 7, 1, 1], Means: 46.473, Median: 43.0, Standard Deviation: 15.845641525522257
-Vector: [3, 5, 1, 5, 2, 2], Means: 46.604, Median: 40.0, Standard Deviation: 20.614561458933444
-Vector: [3, 4, 1, 7, 2, 1], Means: 46.78, Median: 44.0, Standard Deviation: 15.811565564662015
-Vector: [2, 4, 2, 5, 3, 2], Means: 47.836, Median: 42.0, Standard Deviation: 21.350619498107143
-Vector: [3, 4, 2, 6, 1, 2], Means: 48.748, Median: 43.0, Standard Deviation: 20.434482231367255
-Vector: [2, 4, 2, 6, 2, 2], Means: 49.064, Median: 43.0, Standard Deviation: 20.50146858676749
-Vector: [3, 3, 2, 6, 2, 2], Means: 49.324, Median: 43.5, Standard Deviation: 20.175978144667337
-Vector: [3, 4, 1, 6, 2, 2], Means: 49.363, Median: 44.0, Standard Deviation: 20.102072637524827
-Vector: [3, 3, 3, 4, 2, 3], Means: 57.523, Median: 49.0, Standard Deviation: 28.334790123297743
-Vector: [3, 4, 2, 4, 2, 3], Means: 57.599, Median: 49.0, Standard Deviation: 28.48743113607706
-Vector: [3, 3, 3, 3, 3, 3], Means: 58.066, Median: 50.0, Standard Deviation: 28.365158667390286
-Vector: [3, 4, 2, 3, 3, 3], Means: 58.066, Median: 50.0, Standard Deviation: 28.577899508892187
-Vector: [2, 3, 3, 4, 3, 3], Means: 58.425, Median: 51.0, Standard Deviation: 28.08425003627656
-Vector: [2, 3, 3, 5, 2, 3], Means: 58.739, Median: 51.0, Standard Deviation: 28.09958123291992
-Vector: [3, 3, 2, 4, 3, 3], Means: 58.739, Median: 51.0, Standard Deviation: 28.225406153898874
-Vector: [3, 3, 3, 5, 1, 3], Means: 58.849, Median: 51.0, Standard Deviation: 28.194736071510622
-Vector: [3, 4, 2, 5, 1, 3], Means: 58.852, Median: 51.0, Standard Deviation: 28.16763233769412
-Vector: [3, 3, 2, 5, 2, 3], Means: 58.898, Median: 51.0, Standard Deviation: 27.903802934693655
-Vector: [3, 3, 3, 4, 1, 4], Means: 74.05, Median: 67.0, Standard Deviation: 35.73931726822434
-[Finished in 6.0s]
+Vector: [3, 6, 5, 3, 1, 0], Means: 31.535309421, Median: 30.0, Standard Deviation: 7.745283666
+Vector: [3, 7, 4, 3, 1, 0], Means: 31.6937841, Median: 30.0, Standard Deviation: 7.659803359
+Vector: [3, 6, 4, 3, 2, 0], Means: 31.909584144, Median: 30.0, Standard Deviation: 8.62568145
+Vector: [2, 7, 5, 3, 1, 0], Means: 31.983990005, Median: 31.0, Standard Deviation: 7.591616036
+Vector: [3, 7, 5, 2, 1, 0], Means: 31.983990005, Median: 31.0, Standard Deviation: 7.591616036
+Vector: [2, 6, 5, 3, 2, 0], Means: 32.205810117, Median: 30.0, Standard Deviation: 8.548634066
+Vector: [3, 6, 5, 2, 2, 0], Means: 32.205810117, Median: 30.0, Standard Deviation: 8.548634066
+Vector: [3, 6, 4, 4, 1, 0], Means: 32.293891732, Median: 31.0, Standard Deviation: 8.432473846
+Vector: [4, 6, 4, 3, 1, 0], Means: 32.293891732, Median: 31.0, Standard Deviation: 8.432473846
+Vector: [3, 5, 5, 3, 2, 0], Means: 32.300793785, Median: 30.0, Standard Deviation: 8.804559739
+Vector: [2, 7, 4, 3, 2, 0], Means: 32.357993919, Median: 31.0, Standard Deviation: 8.462211795
+Vector: [3, 7, 4, 2, 2, 0], Means: 32.357993919, Median: 31.0, Standard Deviation: 8.462211795
+Vector: [3, 7, 5, 3, 0, 0], Means: 32.532266363, Median: 31.0, Standard Deviation: 7.603218507
+Vector: [2, 6, 5, 4, 1, 0], Means: 32.576342407, Median: 31.0, Standard Deviation: 8.351436653
+Vector: [4, 6, 5, 2, 1, 0], Means: 32.576342407, Median: 31.0, Standard Deviation: 8.351436653
+Vector: [2, 6, 6, 3, 1, 0], Means: 32.660648242, Median: 31.0, Standard Deviation: 8.108873082
+Vector: [3, 6, 6, 2, 1, 0], Means: 32.660648242, Median: 31.0, Standard Deviation: 8.108873082
+Vector: [3, 5, 5, 4, 1, 0], Means: 32.673205498, Median: 31.0, Standard Deviation: 8.604301609
+Vector: [4, 5, 5, 3, 1, 0], Means: 32.673205498, Median: 31.0, Standard Deviation: 8.604301609
+Vector: [2, 7, 4, 4, 1, 0], Means: 32.72066223, Median: 31.0, Standard Deviation: 8.262954905
+Vector: [3, 5, 6, 3, 1, 0], Means: 32.758678678, Median: 31.0, Standard Deviation: 8.366394811
+Vector: [2, 8, 4, 3, 1, 0], Means: 32.802667715, Median: 31.0, Standard Deviation: 7.818387469
+Vector: [4, 6, 4, 2, 2, 0], Means: 32.944046509, Median: 31.0, Standard Deviation: 9.118660554
+Vector: [4, 7, 3, 3, 1, 0], Means: 33.017327111, Median: 31.0, Standard Deviation: 8.43973685
+Vector: [3, 5, 4, 4, 2, 0], Means: 33.038441667, Median: 31.0, Standard Deviation: 9.34634252
+Vector: [4, 5, 4, 3, 2, 0], Means: 33.038441667, Median: 31.0, Standard Deviation: 9.34634252
+Vector: [3, 6, 5, 4, 0, 0], Means: 33.110684799, Median: 32.0, Standard Deviation: 8.32524277
+Vector: [4, 6, 5, 3, 0, 0], Means: 33.110684799, Median: 32.0, Standard Deviation: 8.32524277
+Vector: [3, 6, 6, 3, 0, 0], Means: 33.185610069, Median: 32.0, Standard Deviation: 8.086103003
+Vector: [3, 7, 5, 1, 2, 0], Means: 33.221170542, Median: 32.0, Standard Deviation: 8.473747684
+Vector: [4, 6, 3, 3, 2, 0], Means: 33.241830455, Median: 31.0, Standard Deviation: 9.266572652
+Vector: [3, 7, 4, 4, 0, 0], Means: 33.245004364, Median: 32.0, Standard Deviation: 8.236758005
+Vector: [4, 7, 4, 3, 0, 0], Means: 33.245004364, Median: 32.0, Standard Deviation: 8.236758005
+Vector: [3, 8, 4, 3, 0, 0], Means: 33.313556979, Median: 32.0, Standard Deviation: 7.800806859
+Vector: [2, 8, 4, 2, 2, 0], Means: 33.430215445, Median: 32.0, Standard Deviation: 8.53242956
+Vector: [4, 7, 3, 2, 2, 0], Means: 33.64302229, Median: 32.0, Standard Deviation: 9.08343788
+Vector: [4, 6, 5, 1, 2, 0], Means: 33.785274559, Median: 32.0, Standard Deviation: 9.077914214
+Vector: [3, 6, 4, 3, 1, 1], Means: 33.91170644, Median: 31.0, Standard Deviation: 12.137877694
+Vector: [2, 6, 5, 3, 1, 1], Means: 34.186624227, Median: 31.0, Standard Deviation: 12.042907997
+Vector: [3, 6, 5, 2, 1, 1], Means: 34.186624227, Median: 31.0, Standard Deviation: 12.042907997
+Vector: [3, 5, 5, 3, 1, 1], Means: 34.27818263, Median: 31.0, Standard Deviation: 12.202886226
+Vector: [2, 7, 4, 3, 1, 1], Means: 34.327312277, Median: 32.0, Standard Deviation: 11.96268722
+Vector: [3, 7, 4, 2, 1, 1], Means: 34.327312277, Median: 32.0, Standard Deviation: 11.96268722
+Vector: [3, 7, 3, 3, 1, 1], Means: 34.613709153, Median: 32.0, Standard Deviation: 12.041702997
+Vector: [2, 6, 4, 3, 3, 0], Means: 34.665573532, Median: 32.0, Standard Deviation: 11.012389527
+Vector: [3, 6, 4, 2, 3, 0], Means: 34.665573532, Median: 32.0, Standard Deviation: 11.012389527
+Vector: [3, 6, 5, 3, 0, 1], Means: 34.705983805, Median: 32.0, Standard Deviation: 11.949348065
+Vector: [3, 5, 4, 3, 3, 0], Means: 34.757258151, Median: 32.0, Standard Deviation: 11.178698572
+Vector: [3, 6, 3, 3, 2, 1], Means: 34.827224782, Median: 32.0, Standard Deviation: 12.594032606
+Vector: [2, 7, 4, 2, 3, 0], Means: 35.040479609, Median: 33.0, Standard Deviation: 10.821164582
+Vector: [3, 7, 3, 2, 3, 0], Means: 35.309284472, Median: 33.0, Standard Deviation: 10.897824927
+Vector: [5, 5, 4, 2, 2, 0], Means: 35.323706215, Median: 33.0, Standard Deviation: 10.466063848
+Vector: [3, 6, 5, 1, 3, 0], Means: 35.440447483, Median: 33.0, Standard Deviation: 10.877438595
+Vector: [5, 6, 3, 2, 2, 0], Means: 35.492624469, Median: 33.0, Standard Deviation: 10.378210767
+Vector: [3, 7, 4, 1, 3, 0], Means: 35.557972077, Median: 33.0, Standard Deviation: 10.792043837
+Vector: [4, 5, 4, 2, 3, 0], Means: 35.663151724, Median: 33.0, Standard Deviation: 11.349303474
+Vector: [2, 7, 5, 1, 3, 0], Means: 35.77960288, Median: 33.0, Standard Deviation: 10.68949777
+Vector: [4, 6, 3, 2, 3, 0], Means: 35.833416967, Median: 33.0, Standard Deviation: 11.261067683
+Vector: [4, 6, 4, 1, 3, 0], Means: 36.075654116, Median: 34.0, Standard Deviation: 11.150063618
+Vector: [2, 6, 4, 2, 3, 1], Means: 37.079275996, Median: 34.0, Standard Deviation: 13.780931085
+Vector: [2, 5, 4, 3, 3, 1], Means: 37.1667148, Median: 34.0, Standard Deviation: 13.890796836
+Vector: [3, 5, 4, 2, 3, 1], Means: 37.1667148, Median: 34.0, Standard Deviation: 13.890796836
+Vector: [3, 6, 3, 2, 3, 1], Means: 37.332637698, Median: 34.0, Standard Deviation: 13.800800339
+Vector: [2, 6, 5, 1, 3, 1], Means: 37.778025589, Median: 34.0, Standard Deviation: 13.5745744
+Vector: [1, 7, 4, 2, 3, 1], Means: 37.882379439, Median: 35.0, Standard Deviation: 13.495253912
+Vector: [2, 6, 4, 2, 4, 0], Means: 39.648658613, Median: 36.0, Standard Deviation: 14.301019186
+Vector: [3, 6, 4, 1, 4, 0], Means: 40.060348906, Median: 37.0, Standard Deviation: 14.174441043
+Vector: [1, 7, 4, 2, 4, 0], Means: 40.315239199, Median: 37.0, Standard Deviation: 13.987111729
+Vector: [2, 7, 4, 1, 4, 0], Means: 40.315239199, Median: 37.0, Standard Deviation: 13.987111729
+Vector: [1, 6, 4, 2, 4, 1], Means: 42.083398273, Median: 38.0, Standard Deviation: 15.729570577
+Vector: [2, 6, 4, 1, 4, 1], Means: 42.083398273, Median: 38.0, Standard Deviation: 15.729570577
+Vector: [2, 5, 4, 2, 3, 2], Means: 45.088674827, Median: 40.0, Standard Deviation: 20.417298974
+Vector: [3, 5, 3, 2, 3, 2], Means: 45.274905751, Median: 40.0, Standard Deviation: 20.365044116
+Vector: [1, 6, 4, 2, 3, 2], Means: 45.36094676, Median: 40.0, Standard Deviation: 20.226692648
+Vector: [2, 4, 4, 3, 3, 2], Means: 45.373458143, Median: 40.0, Standard Deviation: 20.321897715
+Vector: [3, 4, 4, 2, 3, 2], Means: 45.373458143, Median: 40.0, Standard Deviation: 20.321897715
+Vector: [2, 5, 5, 1, 3, 2], Means: 45.579344627, Median: 40.0, Standard Deviation: 20.150318743
+Vector: [1, 5, 4, 2, 4, 2], Means: 48.971690879, Median: 44.0, Standard Deviation: 20.470813599
+Vector: [2, 5, 4, 1, 4, 2], Means: 48.971690879, Median: 44.0, Standard Deviation: 20.470813599
+Vector: [2, 4, 4, 2, 3, 3], Means: 57.994822073, Median: 51.0, Standard Deviation: 27.465200119
+Vector: [1, 5, 4, 2, 3, 3], Means: 58.024175716, Median: 51.0, Standard Deviation: 27.426813562
+Vector: [3, 4, 3, 2, 3, 3], Means: 58.10464317, Median: 52.0, Standard Deviation: 27.398980958
+Vector: [2, 3, 4, 3, 3, 3], Means: 58.226663702, Median: 52.0, Standard Deviation: 27.295745444
+Vector: [3, 3, 4, 2, 3, 3], Means: 58.226663702, Median: 52.0, Standard Deviation: 27.295745444
+Vector: [2, 4, 5, 1, 3, 3], Means: 58.261549631, Median: 52.0, Standard Deviation: 27.249210304
+Vector: [3, 3, 3, 3, 3, 3], Means: 58.332812175, Median: 52.0, Standard Deviation: 27.231772707
+Vector: [3, 3, 5, 1, 3, 3], Means: 58.480430502, Median: 52.0, Standard Deviation: 27.090296073
+Vector: [4, 3, 3, 2, 3, 3], Means: 58.669384128, Median: 52.0, Standard Deviation: 27.024625395
+Vector: [4, 2, 4, 2, 3, 3], Means: 58.807444402, Median: 52.0, Standard Deviation: 26.901814122
+Vector: [4, 3, 2, 3, 3, 3], Means: 58.862461234, Median: 52.0, Standard Deviation: 26.883259509
+Vector: [1, 4, 4, 2, 4, 3], Means: 60.520446441, Median: 55.0, Standard Deviation: 26.666413185
+Vector: [2, 4, 4, 1, 4, 3], Means: 60.520446441, Median: 55.0, Standard Deviation: 26.666413185
+Vector: [2, 3, 4, 2, 4, 3], Means: 60.551693611, Median: 55.0, Standard Deviation: 26.643622851
+Vector: [2, 3, 3, 3, 4, 3], Means: 60.638601418, Median: 55.0, Standard Deviation: 26.586411255
+Vector: [3, 3, 3, 2, 4, 3], Means: 60.638601418, Median: 55.0, Standard Deviation: 26.586411255
+Vector: [3, 3, 4, 1, 4, 3], Means: 60.697599726, Median: 55.0, Standard Deviation: 26.526897928
 """
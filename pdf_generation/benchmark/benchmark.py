@@ -0,0 +1,230 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+This script benchmarks the pdf_generation tools on synthetic workloads:
+- variants.py with N variants
+- transcript.py with CSV files of N students
+- sitzplan.py with seating plans of rows x columns seats
+
+Every workload runs with the real TeX toolchain and with a stub compiler that skips TeX
+(see stub_latexmk.py), so the python side of the pipeline can be measured on its own.
+The stage timings come from the --profile reports of the tools.
+The results are written as json, together with the git commit, so runs can be compared across commits.
+
+example:
+>> python3 benchmark.py --compiler stub --students 10,100,1000 -o before.json
+
+Prerequisits:
+- latex (only for --compiler tex)
+- python 3.x
+- PyPDF2 python module
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import tempfile
+import time
+
+# symlink to library contained in repository
+from lib import util
+
+# directory of this script and of the tools
+BENCHMARK_DIR = os.path.dirname(os.path.realpath(__file__))
+TOOLS_DIR = os.path.dirname(BENCHMARK_DIR)
+
+# the stand-in for latexmk
+STUB_LATEXMK = os.path.join(BENCHMARK_DIR, 'stub_latexmk.py')
+
+# names for the synthetic students
+FIRST_NAMES = ['Ada', 'Alan', 'Grace', 'Konrad', 'Emmy', 'Kurt', 'Lise', 'Carl', 'Sophie', 'Max']
+LAST_NAMES = ['Lovelace', 'Turing', 'Hopper', 'Zuse', 'Noether', 'Gödel', 'Meitner', 'Gauß', 'Germain', 'Planck']
+
+
+def parse_args():
+  """parse command line arguments and return them as Namespace"""
+
+  parser = argparse.ArgumentParser(
+    description='Benchmarks the pdf_generation tools on synthetic workloads.')
+  parser.add_argument('--compiler', default='both', choices=['tex', 'stub', 'both'],
+                   help='compile with the real TeX toolchain, the stub compiler or both')
+  parser.add_argument('--variants', default='1,10,40',
+                   help='comma separated numbers of variants for variants.py')
+  parser.add_argument('--students', default='10,100,1000',
+                   help='comma separated numbers of students for transcript.py')
+  parser.add_argument('--grids', default='5x6,20x30',
+                   help='comma separated seating plan sizes (rows x columns) for sitzplan.py')
+  parser.add_argument('-r', '--repeat', default=1, type=int,
+                   help='the number of runs per workload. The fastest run is reported.')
+  parser.add_argument('-j', '--jobs', default=os.cpu_count(), type=int,
+                   help='the number of LaTeX processes running in parallel (default: number of CPUs)')
+  parser.add_argument('-o', '--output',
+                   help='the json file for the results (default: benchmark-<commit>.json)')
+  return parser.parse_args()
+
+
+def load_tool(name):
+  """imports one of the tools as a module, e.g. load_tool('variants/variants.py')"""
+
+  path = os.path.join(TOOLS_DIR, name)
+  spec = importlib.util.spec_from_file_location(os.path.splitext(os.path.basename(name))[0], path)
+  module = importlib.util.module_from_spec(spec)
+  spec.loader.exec_module(module)
+  return module
+
+
+def git_commit():
+  """returns the current git commit of the repository, or None"""
+
+  try:
+    return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=BENCHMARK_DIR,
+      stderr=subprocess.DEVNULL).decode().strip()
+  except (OSError, subprocess.CalledProcessError):
+    return None
+
+
+def use_compiler(compiler):
+  """switches util between latexmk and the stub compiler"""
+
+  util.LATEXMK = STUB_LATEXMK if compiler == 'stub' else 'latexmk'
+
+  # worker processes that import util afresh read the environment
+  os.environ['LATEXMK'] = util.LATEXMK
+
+
+def write_transcript_csv(file_name, students, blocks=10):
+  """writes a CSV file in the format of transcript.py, with random scores"""
+
+  rnd = random.Random(students)
+  header = ['Vorname', 'Nachname', 'Klasse']
+  for b in range(blocks):
+    header += ['Aufgabe{} {}.3.18'.format(b + 1, b + 1), 'Team', 'Punkte (max 5)']
+
+  with open(file_name, 'w', encoding='utf8') as file:
+    file.write(';'.join(header) + '\n')
+    for s in range(students):
+      row = [rnd.choice(FIRST_NAMES), '{}{}'.format(rnd.choice(LAST_NAMES), s), '9a']
+      for b in range(blocks):
+        row += [rnd.choice(['Passt', 'Läuft!', 'keine Abgabe', '']), '', str(rnd.randint(0, 5))]
+      file.write(';'.join(row) + '\n')
+
+
+def write_seating_csv(file_name, rows, columns):
+  """writes a CSV file in the format of sitzplan.py, with every seat taken"""
+
+  with open(file_name, 'w', encoding='utf8') as file:
+    file.write('name;row;column;hands;string\n')
+    for y in range(rows):
+      for x in range(columns):
+        file.write('{}{};{};{};{};{}\n'.format(FIRST_NAMES[(x + y) % len(FIRST_NAMES)], y * columns + x,
+          y, x, (x * y) % 4, '+' * (x % 3)))
+
+
+def series_options(compiler, args):
+  """returns the options of create_pdf_series for a benchmark run"""
+
+  # never use the compile cache, and no formats with the stub compiler
+  return dict(jobs=args.jobs, no_cache=True, no_format=(compiler == 'stub'),
+    batch=False, optimize=False, watch=False, profile=True)
+
+
+def run(build, output):
+  """
+  runs a build, hiding its output, and returns its wall time and the stage totals of its profile.
+  output is the output file name passed to the tool, without .pdf for sitzplan.py.
+  """
+
+  start = time.perf_counter()
+  with contextlib.redirect_stdout(io.StringIO()):
+    build()
+  wall = time.perf_counter() - start
+
+  with open(output + '.profile.json') as file:
+    return wall, json.load(file)['totals']
+
+
+def benchmarks(args):
+  """yields the name, size and build function of all workloads"""
+
+  variants = load_tool('variants/variants.py')
+  transcript = load_tool('transcript/transcript.py')
+  sitzplan = load_tool('sitzplan/sitzplan.py')
+
+  for n in [int(n) for n in args.variants.split(',') if n]:
+    def build(compiler, n=n):
+      options = argparse.Namespace(variants=n, output='variants.pdf', seed=0, differ=False, key=False,
+        **series_options(compiler, args))
+      return run(lambda: variants.build(options), options.output)
+    yield 'variants', n, build
+
+  for n in [int(n) for n in args.students.split(',') if n]:
+    csv_file = 'students{}.csv'.format(n)
+    write_transcript_csv(csv_file, n)
+    def build(compiler, csv_file=csv_file):
+      options = argparse.Namespace(csvfile=csv_file, encoding='utf8', studentname='',
+        output='transcript.pdf', **series_options(compiler, args))
+      return run(lambda: transcript.build(options), options.output)
+    yield 'transcript', n, build
+
+  for grid in [g for g in args.grids.split(',') if g]:
+    rows, columns = [int(k) for k in grid.split('x')]
+    csv_file = 'seats{}.csv'.format(grid)
+    write_seating_csv(csv_file, rows, columns)
+    def build(compiler, csv_file=csv_file, columns=columns):
+      options = argparse.Namespace(csvfile=csv_file, encoding='utf8', output='sitzplan', title='Benchmark',
+        hspacing=str([3] * (columns - 1)), **series_options(compiler, args))
+      return run(lambda: sitzplan.build(options), options.output)
+    yield 'sitzplan', grid, build
+
+
+def main():
+
+  # parse command line arguments
+  args = parse_args()
+  compilers = ['tex', 'stub'] if args.compiler == 'both' else [args.compiler]
+  if 'tex' in compilers and not shutil.which('latexmk'):
+    print('latexmk not found, benchmarking with the stub compiler only')
+    compilers.remove('tex')
+
+  commit = git_commit()
+  output = os.path.abspath(args.output or 'benchmark-{}.json'.format((commit or 'unknown')[:8]))
+
+  # run the workloads in a scratch directory
+  results = []
+  work_dir = tempfile.mkdtemp(prefix='benchmark')
+  cwd = os.getcwd()
+  os.chdir(work_dir)
+  try:
+    for workload, size, build in benchmarks(args):
+      for compiler in compilers:
+        use_compiler(compiler)
+
+        # report the fastest of the repeated runs
+        runs = [build(compiler) for _ in range(args.repeat)]
+        wall, stages = min(runs, key=lambda r: r[0])
+        results.append({'workload': workload, 'size': size, 'compiler': compiler,
+          'wall': wall, 'stages': stages})
+        print('{:<12}{:>8}{:>6}{:>10.3f} s'.format(workload, size, compiler, wall))
+  finally:
+    os.chdir(cwd)
+    shutil.rmtree(work_dir)
+
+  # write the results
+  with open(output, 'w') as file:
+    json.dump({'commit': commit, 'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+      'python': platform.python_version(), 'platform': platform.platform(), 'jobs': args.jobs,
+      'results': results}, file, indent=2)
+  print('Results written to ' + output)
+
+
+# execute only if run as a script
+if __name__ == "__main__":
+    main()
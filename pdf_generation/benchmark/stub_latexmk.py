@@ -0,0 +1,64 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+A stand-in for latexmk that skips TeX.
+It accepts the command line of util.create_pdf and writes a blank one-page pdf,
+so the benchmark can measure the python side of the pipeline on its own.
+
+The path must be absolute, as latexmk is started in the directory of each variant.
+The compile cache keeps the stub's pdfs apart from those of latexmk.
+
+example:
+>> LATEXMK=$PWD/stub_latexmk.py python3 ../variants/variants.py -v 10
+"""
+
+import sys
+
+
+def blank_pdf(comment):
+  """returns the bytes of a valid pdf with a single blank A4 page"""
+
+  objects = [
+    b'<< /Type /Catalog /Pages 2 0 R >>',
+    b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+    b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << >> /Contents 4 0 R >>',
+    b'<< /Length ' + str(len(comment)).encode() + b' >>\nstream\n' + comment + b'\nendstream']
+
+  # write the objects and remember their offsets for the cross reference table
+  pdf = b'%PDF-1.4\n'
+  offsets = []
+  for number, obj in enumerate(objects, 1):
+    offsets.append(len(pdf))
+    pdf += str(number).encode() + b' 0 obj\n' + obj + b'\nendobj\n'
+
+  xref = len(pdf)
+  pdf += 'xref\n0 {}\n0000000000 65535 f \n'.format(len(objects) + 1).encode()
+  for offset in offsets:
+    pdf += '{:010d} 00000 n \n'.format(offset).encode()
+  pdf += 'trailer\n<< /Size {} /Root 1 0 R >>\nstartxref\n{}\n%%EOF\n'.format(
+    len(objects) + 1, xref).encode()
+  return pdf
+
+
+def main():
+
+  # the last argument is the file name, without .tex
+  file_name = sys.argv[-1]
+  if file_name.endswith('.tex'):
+    file_name = file_name[:-4]
+
+  # read the tex source like latex would, and note its size in the pdf
+  with open(file_name + '.tex', 'rb') as file:
+    size = len(file.read())
+
+  with open(file_name + '.pdf', 'wb') as file:
+    file.write(blank_pdf('% stub for {} bytes of tex'.format(size).encode()))
+
+  # the same line latexmk prints, so the run is counted
+  print("Latexmk: Run number 1 of rule 'xelatex'")
+
+
+# execute only if run as a script
+if __name__ == "__main__":
+    main()
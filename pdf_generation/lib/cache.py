@@ -0,0 +1,87 @@
+"""
+A persistent cache for compiled pdf files.
+Entries are keyed by a hash of the TeX source, the resource files copied next to it and the compiler,
+so an unchanged variant can reuse its pdf without running latex again.
+"""
+
+import hashlib
+import os
+import shutil
+
+# default location of the cache, following the XDG convention
+CACHE_DIR = os.path.join(
+  os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache')), 'pdf_generation')
+
+# default maximum size of the cached pdf files in bytes
+CACHE_SIZE = 500 * 1024 * 1024
+
+
+def hash_resources(resource_files):
+  """returns a hex digest over the names and contents of the resources, given as tuples (path, name)"""
+
+  digest = hashlib.sha256()
+  for full_file_name, name in sorted(resource_files, key=lambda r: r[1]):
+    digest.update(name.encode() + b'\0')
+    with open(full_file_name, 'rb') as file:
+      for chunk in iter(lambda: file.read(1 << 16), b''):
+        digest.update(chunk)
+    digest.update(b'\0')
+  return digest.hexdigest()
+
+
+class CompileCache:
+  """
+  a directory of pdf files named by their content key.
+  The modification time of an entry is its last use, so eviction can drop the least recently used.
+  """
+
+  def __init__(self, cache_dir=CACHE_DIR, max_size=CACHE_SIZE):
+    self.pdf_dir = os.path.join(cache_dir, 'pdf')
+    self.max_size = max_size
+    os.makedirs(self.pdf_dir, exist_ok=True)
+
+  def key(self, tex_doc, resources='', compiler='latexmk'):
+    """
+    computes the cache key of a tex document, the digest of its resources and the compiler command.
+    Pdfs of a replaced compiler (e.g. the benchmark's stub) never stand in for those of latexmk.
+    """
+    return hashlib.sha256((compiler + '\0' + resources + '\0' + tex_doc).encode()).hexdigest()
+
+  def lookup(self, key):
+    """returns the path of the cached pdf, or None if there is no such entry"""
+
+    file_name = os.path.join(self.pdf_dir, key + '.pdf')
+    try:
+      # mark the entry as recently used
+      os.utime(file_name)
+    except FileNotFoundError:
+      return None
+    return file_name
+
+  def store(self, key, pdf_file):
+    """copies a compiled pdf into the cache and returns the path of the entry"""
+
+    # copy to a temp name first, so a parallel reader never sees a partial file
+    file_name = os.path.join(self.pdf_dir, key + '.pdf')
+    temp_name = '{}.{}.tmp'.format(file_name, os.getpid())
+    shutil.copyfile(pdf_file, temp_name)
+    os.replace(temp_name, file_name)
+    return file_name
+
+  def evict(self):
+    """deletes the least recently used entries until the cache fits into max_size"""
+
+    # collect (mtime, size, path) of all entries
+    entries = []
+    for file_name in os.listdir(self.pdf_dir):
+      full_file_name = os.path.join(self.pdf_dir, file_name)
+      stat = os.stat(full_file_name)
+      entries.append((stat.st_mtime, stat.st_size, full_file_name))
+
+    # delete the oldest entries first
+    total_size = sum(e[1] for e in entries)
+    for mtime, size, full_file_name in sorted(entries):
+      if total_size <= self.max_size:
+        break
+      os.remove(full_file_name)
+      total_size -= size
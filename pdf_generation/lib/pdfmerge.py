@@ -0,0 +1,273 @@
+"""
+Incremental merging of pdf files.
+PyPDF2 reads the inputs, but the output is written object by object,
+so each input can be closed as soon as its pages have been copied.
+"""
+
+import hashlib
+import io
+
+import PyPDF2
+from PyPDF2 import generic
+
+# resource categories whose objects are shared between the inputs (fonts and images)
+SHARED_RESOURCES = ('/Font', '/XObject')
+
+
+class StreamMerger:
+  """
+  appends the pages of pdf files to an output file, one input at a time.
+  Only the offsets of the written objects and the hashes of the shared resources
+  are kept in memory, so the number of inputs is not limited by memory or open files.
+  Fonts and images that are identical in several inputs are written only once.
+  With share_all, this holds for all objects except the pages themselves.
+  Inputs can be given a bookmark, which is written to the outline of the output.
+  """
+
+  def __init__(self, file, share_all=False):
+    """
+    file:       a binary file object to write the merged pdf to
+    share_all:  a boolean indicating whether all identical objects shall be shared, not only resources
+    """
+
+    self.file = file
+    self.position = 0
+    self.share_all = share_all
+
+    # number of bytes not written, because an identical object was written before
+    self.saved = 0
+
+    # offsets of the written objects. The index is the object number, 0 is reserved by pdf.
+    self.offsets = [None]
+
+    # the page tree and the catalog are written on close, but referred to by every page
+    self.pages_id = self._allocate()
+    self.catalog_id = self._allocate()
+    self.page_ids = []
+
+    # the outline entries as tuples (title, object number of the page)
+    self.bookmarks = []
+
+    # maps the hashes of shared objects to their object numbers
+    self.shared = {}
+
+    # maps the object numbers of the current input to those of the output
+    self.imported = None
+
+    self._write(b'%PDF-1.5\n%\xe2\xe3\xcf\xd3\n')
+
+  def append(self, file_name, bookmark=None, keep_outline=False):
+    """
+    copies all pages of a pdf file to the output and closes it again.
+
+    bookmark:      a title for the outline, pointing to the first page of the file, or None
+    keep_outline:  a boolean indicating whether the top level entries of the file's outline shall be kept
+    """
+
+    with open(file_name, 'rb') as file:
+      reader = PyPDF2.PdfFileReader(file, strict=False)
+      self.imported = {}
+      first = len(self.page_ids)
+
+      # reserve the numbers of all pages first, as annotations and links may refer to any page of the file
+      pages = [reader.getPage(i) for i in range(reader.getNumPages())]
+      page_ids = [self._allocate() for _ in pages]
+      for page, page_id in zip(pages, page_ids):
+        if page.indirectRef is not None:
+          self.imported[page.indirectRef.idnum, page.indirectRef.generation] = page_id
+
+      for page, page_id in zip(pages, page_ids):
+        self._add_page(page, page_id)
+      self.imported = None
+
+      if bookmark is not None and len(self.page_ids) > first:
+        self.bookmarks.append((bookmark, self.page_ids[first]))
+
+      # only entries with a destination in the file, nested entries come as lists
+      if keep_outline:
+        for entry in reader.getOutlines():
+          if isinstance(entry, generic.Destination) and entry.page is not None:
+            page = reader.getDestinationPageNumber(entry)
+            if page >= 0:
+              self.bookmarks.append((entry.title, self.page_ids[first + page]))
+
+  def close(self):
+    """writes the page tree, the catalog and the cross reference table"""
+
+    # the page tree is flat: all pages are kids of the root
+    pages = generic.DictionaryObject({
+      generic.NameObject('/Type'): generic.NameObject('/Pages'),
+      generic.NameObject('/Kids'): generic.ArrayObject(self._ref(n) for n in self.page_ids),
+      generic.NameObject('/Count'): generic.NumberObject(len(self.page_ids))})
+    self._write_object(self.pages_id, _serialize(pages))
+
+    catalog = generic.DictionaryObject({
+      generic.NameObject('/Type'): generic.NameObject('/Catalog'),
+      generic.NameObject('/Pages'): self._ref(self.pages_id)})
+    if self.bookmarks:
+      catalog[generic.NameObject('/Outlines')] = self._ref(self._write_outline())
+      catalog[generic.NameObject('/PageMode')] = generic.NameObject('/UseOutlines')
+    self._write_object(self.catalog_id, _serialize(catalog))
+
+    # cross reference table. Each entry has exactly 20 bytes.
+    xref = self.position
+    self._write('xref\n0 {}\n'.format(len(self.offsets)).encode())
+    self._write(b'0000000000 65535 f \n')
+    for offset in self.offsets[1:]:
+      self._write('{:010d} 00000 n \n'.format(offset).encode())
+
+    # trailer
+    self._write('trailer\n<< /Size {} /Root {} 0 R >>\nstartxref\n{}\n%%EOF\n'.format(
+      len(self.offsets), self.catalog_id, xref).encode())
+
+  def _write_outline(self):
+    """writes the bookmarks as a flat outline and returns the number of its root"""
+
+    outline_id = self._allocate()
+    item_ids = [self._allocate() for _ in self.bookmarks]
+
+    # the entries form a linked list below the root, each one showing its whole page
+    for k, (title, page_id) in enumerate(self.bookmarks):
+      item = generic.DictionaryObject({
+        generic.NameObject('/Title'): generic.createStringObject(title),
+        generic.NameObject('/Parent'): self._ref(outline_id),
+        generic.NameObject('/Dest'): generic.ArrayObject([self._ref(page_id), generic.NameObject('/Fit')])})
+      if k > 0:
+        item[generic.NameObject('/Prev')] = self._ref(item_ids[k - 1])
+      if k < len(item_ids) - 1:
+        item[generic.NameObject('/Next')] = self._ref(item_ids[k + 1])
+      self._write_object(item_ids[k], _serialize(item))
+
+    outline = generic.DictionaryObject({
+      generic.NameObject('/Type'): generic.NameObject('/Outlines'),
+      generic.NameObject('/First'): self._ref(item_ids[0]),
+      generic.NameObject('/Last'): self._ref(item_ids[-1]),
+      generic.NameObject('/Count'): generic.NumberObject(len(item_ids))})
+    self._write_object(outline_id, _serialize(outline))
+    return outline_id
+
+  def _add_page(self, page, page_id):
+    """copies a page and everything it refers to, as the object page_id reserved for it"""
+
+    # the page gets the new page tree as parent. PyPDF2 already copied inherited attributes.
+    copy = generic.DictionaryObject()
+    for key, value in page.items():
+      if key == '/Parent':
+        continue
+      if key == '/Resources':
+        copy[key] = self._copy_resources(value.getObject())
+      else:
+        copy[key] = self._copy(value, self.share_all)
+    copy[generic.NameObject('/Parent')] = self._ref(self.pages_id)
+
+    self._write_object(page_id, _serialize(copy))
+    self.page_ids.append(page_id)
+
+  def _copy_resources(self, resources):
+    """copies a resource dictionary. Fonts and images are shared with other inputs."""
+
+    copy = generic.DictionaryObject()
+    for key, value in resources.items():
+      share = self.share_all or key in SHARED_RESOURCES
+      copy[key] = self._copy(value, share)
+    return copy
+
+  def _copy(self, obj, share=False):
+    """
+    copies a pdf object of the current input, replacing references by those of the output.
+    If share is set, the objects it refers to are shared with identical objects of other inputs.
+    """
+
+    if isinstance(obj, generic.IndirectObject):
+      return self._ref(self._import(obj, share))
+
+    if isinstance(obj, generic.StreamObject):
+      copy = generic.StreamObject()
+      copy._data = obj._data
+      for key, value in obj.items():
+        if key != '/Length':
+          copy[key] = self._copy(value, share)
+      return copy
+
+    if isinstance(obj, generic.DictionaryObject):
+      return generic.DictionaryObject((key, self._copy(value, share)) for key, value in obj.items())
+
+    if isinstance(obj, generic.ArrayObject):
+      return generic.ArrayObject(self._copy(value, share) for value in obj)
+
+    # numbers, names, strings etc. are written as they are
+    return obj
+
+  def _import(self, ref, share=False):
+    """writes the object ref points to (if not yet done) and returns its number in the output"""
+
+    key = (ref.idnum, ref.generation)
+    if key in self.imported:
+      number = self.imported[key]
+
+      # reference cycle: reserve a number for the object in progress
+      if number is None:
+        number = self.imported[key] = self._allocate()
+      return number
+
+    # mark as in progress, then copy the object together with everything it refers to
+    self.imported[key] = None
+    data = _serialize(self._copy(ref.getObject(), share))
+    number = self.imported[key]
+
+    # objects in a cycle already have a number, so they can't be shared
+    if number is None and share:
+      digest = hashlib.sha256(data).digest()
+      number = self.shared.get(digest)
+      if number is None:
+        number = self.shared[digest] = self._allocate()
+        self._write_object(number, data)
+      else:
+        self.saved += len(data)
+    else:
+      if number is None:
+        number = self._allocate()
+      self._write_object(number, data)
+
+    self.imported[key] = number
+    return number
+
+  def _allocate(self):
+    """reserves a new object number"""
+    self.offsets.append(None)
+    return len(self.offsets) - 1
+
+  def _ref(self, number):
+    """returns a reference to an object of the output"""
+    return generic.IndirectObject(number, 0, self)
+
+  def _write_object(self, number, data):
+    """writes an object and records its offset"""
+    self.offsets[number] = self.position
+    self._write('{} 0 obj\n'.format(number).encode() + data + b'\nendobj\n')
+
+  def _write(self, data):
+    """writes bytes to the output and keeps track of the position"""
+    self.file.write(data)
+    self.position += len(data)
+
+
+def _serialize(obj):
+  """returns the bytes of a pdf object"""
+  stream = io.BytesIO()
+  obj.writeToStream(stream, None)
+  return stream.getvalue()
+
+
+def optimize(src_file, dst_file):
+  """
+  rewrites a pdf file, storing identical objects only once.
+  The top level entries of the outline are kept.
+  Returns the number of bytes of the duplicates.
+  """
+
+  with open(dst_file, 'wb') as file:
+    merger = StreamMerger(file, share_all=True)
+    merger.append(src_file, keep_outline=True)
+    merger.close()
+  return merger.saved
@@ -0,0 +1,109 @@
+"""
+Timing of the stages of a pdf build.
+Each stage records wall time, cpu time (including child processes such as latexmk)
+and the peak resident set size of the python process and its children.
+"""
+
+import contextlib
+import json
+import os
+import resource
+import sys
+import time
+
+
+def snapshot():
+  """returns the current wall time, cpu time and peak rss as a tuple"""
+
+  times = os.times()
+  cpu = times.user + times.system + times.children_user + times.children_system
+
+  # ru_maxrss is given in kilobytes on linux, but in bytes on macOS
+  rss = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+  rss = rss / 1024 if sys.platform == 'darwin' else rss
+
+  return time.perf_counter(), cpu, rss
+
+
+def measure(start, record):
+  """adds wall time, cpu time and peak rss since the snapshot start to a record (a dict)"""
+
+  end = snapshot()
+  record['wall'] = end[0] - start[0]
+  record['cpu'] = end[1] - start[1]
+  record['peak_rss_mb'] = end[2] / 1024
+  return record
+
+
+class Profile:
+  """collects the records of all stages of a build"""
+
+  def __init__(self):
+    self.records = []
+
+  @contextlib.contextmanager
+  def stage(self, name, **info):
+    """
+    measures the code in a with block as a stage.
+    info is stored with the record, e.g. variant=3. The record can be extended inside the block.
+    """
+
+    record = dict(stage=name, **info)
+    start = snapshot()
+    try:
+      yield record
+    finally:
+      self.records.append(measure(start, record))
+
+  def add(self, record):
+    """adds a record measured elsewhere, e.g. in a worker process"""
+    self.records.append(record)
+
+  def timed(self, name, iterable):
+    """yields the items of iterable, measuring each step as a stage with the variant number"""
+
+    iterator = iter(iterable)
+    for counter in range(1, sys.maxsize):
+      start = snapshot()
+      try:
+        item = next(iterator)
+      except StopIteration:
+        return
+      self.records.append(measure(start, {'stage': name, 'variant': counter}))
+      yield item
+
+  def totals(self):
+    """sums up the records per stage, in the order the stages first appeared"""
+
+    totals = {}
+    for r in self.records:
+      t = totals.setdefault(r['stage'], {'count': 0, 'wall': 0, 'cpu': 0, 'peak_rss_mb': 0})
+      t['count'] += 1
+      t['wall'] += r['wall']
+      t['cpu'] += r['cpu']
+      t['peak_rss_mb'] = max(t['peak_rss_mb'], r['peak_rss_mb'])
+    return totals
+
+  def write(self, file_name):
+    """writes all records and the totals per stage as a json report"""
+
+    with open(file_name, 'w') as file:
+      json.dump({'totals': self.totals(), 'records': self.records}, file, indent=2)
+
+  def summary(self, slowest=5):
+    """returns a short table of the totals per stage and the slowest compiled variants"""
+
+    lines = ['{:<12}{:>7}{:>11}{:>11}{:>15}'.format('stage', 'count', 'wall [s]', 'cpu [s]', 'peak rss [MB]')]
+    for stage, t in self.totals().items():
+      lines.append('{:<12}{:>7}{:>11.3f}{:>11.3f}{:>15.1f}'.format(
+        stage, t['count'], t['wall'], t['cpu'], t['peak_rss_mb']))
+
+    # the variants that took longest to compile
+    compiled = [r for r in self.records if r['stage'] == 'compile' and 'variant' in r]
+    compiled.sort(key=lambda r: r['wall'], reverse=True)
+    if compiled:
+      lines.append('slowest variants: ' + ', '.join('{} ({:.2f} s, {} latex runs)'.format(
+        r['variant'], r['wall'], r.get('runs', '?')) for r in compiled[:slowest]))
+
+    return '\n'.join(lines)
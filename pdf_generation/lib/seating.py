@@ -0,0 +1,201 @@
+"""
+Automatic seat assignment for seating plans.
+People without a seat are placed on the free seats of a room, so that
+- people sharing an apart group don't sit next to each other, not even diagonally,
+- people in adjacent seats of a row or column don't write the same variant,
+- people marked as front sit in the front rows (row 0 is the first row of the plan).
+The assignment is found by local search. It starts from a placement where the variants alternate
+like the colours of a chess board, with the front people in front. Then two seats swap their occupants
+(or an empty place) whenever that doesn't increase the cost of the violated constraints,
+with occasional uphill moves to leave local minima.
+"""
+
+import math
+import random
+
+# the cost of a violated constraint. People that shall be kept apart weigh most.
+APART_COST = 4
+VARIANT_COST = 2
+FRONT_COST = 1
+
+
+def parse_grid(grid):
+  """returns all seats of a grid given as 'ROWSxCOLUMNS', e.g. '5x6', as a list of (row, column)"""
+
+  rows, columns = [int(n) for n in grid.lower().split('x')]
+  return [(y, x) for y in range(rows) for x in range(columns)]
+
+
+def _constraints(person):
+  """returns the apart groups, the variant and the front flag of a person (a dict from the CSV file)"""
+
+  groups = frozenset(g.strip() for g in (person.get('apart') or '').split(',') if g.strip())
+  variant = (person.get('variant') or '').strip() or None
+  front = (person.get('front') or '').strip() not in ('', '0')
+  return groups, variant, front
+
+
+def assign(people, seats, taken=None, front_rows=2, seed=0, steps=20000):
+  """
+  assigns seats to people and returns them as a dict {(row, column): person}, each one with row and column set.
+  The search stops as soon as all constraints are met, or after the given number of moves.
+  Constraints that can't be met are left violated, see violations. The search is deterministic for a given seed.
+
+  people:      a list of people (dicts) without a seat, with the optional keys apart, variant and front
+  seats:       a list of all seats (row, column) of the room
+  taken:       a dict {(row, column): person} of the people who already have a seat. They aren't moved.
+  front_rows:  the number of rows counting as front rows
+  seed:        the seed of the random placement and moves
+  steps:       the maximum number of moves
+  """
+
+  taken = taken or {}
+  free = [seat for seat in seats if seat not in taken]
+  if len(people) > len(free):
+    raise ValueError('{} people, but only {} free seats'.format(len(people), len(free)))
+
+  # the people, as indexes into constraints
+  everyone = list(taken.values()) + list(people)
+  constraints = [_constraints(p) for p in everyone]
+  rnd = random.Random(seed)
+  free = _start(free, list(range(len(taken), len(everyone))), constraints, front_rows, rnd)
+
+  # the occupants of all seats. None is an empty place.
+  positions = list(taken) + [seat for seat, p in free]
+  occupant = list(range(len(taken))) + [p for seat, p in free]
+  index = {seat: k for k, seat in enumerate(positions)}
+
+  # the neighbours of each seat as tuples (index, diagonal)
+  neighbours = []
+  for row, column in positions:
+    near = []
+    for dy in (-1, 0, 1):
+      for dx in (-1, 0, 1):
+        k = index.get((row + dy, column + dx))
+        if (dy or dx) and k is not None:
+          near.append((k, dy != 0 and dx != 0))
+    neighbours.append(near)
+
+  def local_cost(s):
+    """the cost of the constraints involving the occupant of seat s"""
+    p = occupant[s]
+    if p is None:
+      return 0
+    groups, variant, front = constraints[p]
+    cost = FRONT_COST if front and positions[s][0] >= front_rows else 0
+    for t, diagonal in neighbours[s]:
+      q = occupant[t]
+      if q is None:
+        continue
+      if groups and groups & constraints[q][0]:
+        cost += APART_COST
+      if not diagonal and variant is not None and variant == constraints[q][1]:
+        cost += VARIANT_COST
+    return cost
+
+  def conflicts():
+    """the free seats whose occupants violate a constraint"""
+    return [s for s in range(first, len(positions)) if local_cost(s) > 0]
+
+  # local search over swaps of two free seats, with a falling temperature for uphill moves
+  first = len(taken)
+  last = len(positions) - 1
+  conflicted = conflicts()
+  for step in range(steps if last > first else 0):
+
+    # mostly move people that violate a constraint. The list is refreshed from time to time.
+    if step % 100 == 0:
+      conflicted = conflicts()
+      if not conflicted:
+        break
+    s = rnd.choice(conflicted) if rnd.random() < 0.9 else rnd.randint(first, last)
+    t = rnd.randint(first, last)
+    p, q = occupant[s], occupant[t]
+    if p == q or (p is not None and q is not None and constraints[p] == constraints[q]):
+      continue
+
+    # only the constraints of the two seats change. Their mutual ones stay the same.
+    before = local_cost(s) + local_cost(t)
+    occupant[s], occupant[t] = q, p
+    delta = local_cost(s) + local_cost(t) - before
+
+    temperature = 2.0 * (1 - step / steps)
+    if delta > 0 and rnd.random() >= math.exp(-delta / temperature):
+      occupant[s], occupant[t] = p, q
+
+  # write the seats to the new people
+  placement = {}
+  for s in range(first, len(positions)):
+    p = occupant[s]
+    if p is not None:
+      person = everyone[p]
+      person['row'], person['column'] = positions[s]
+      placement[positions[s]] = person
+  return placement
+
+
+def _start(free, people, constraints, front_rows, rnd):
+  """
+  returns a first placement as a list of tuples (seat, person), with None for an empty place.
+  With k variants, the free seats get the colours (row + column) mod k, so seats next to each other
+  in a row or column have different colours. Each variant gets the seats of one colour, front rows first.
+  People that don't fit are placed on the seats left over.
+  """
+
+  # the variants, most frequent first
+  variants = {}
+  for p in people:
+    variants.setdefault(constraints[p][1], []).append(p)
+  order = sorted((v for v in variants if v is not None), key=lambda v: -len(variants[v]))
+  colours = max(len(order), 1)
+
+  # the seats of each colour, front rows first
+  seats = [[] for _ in range(colours)]
+  for seat in free:
+    seats[sum(seat) % colours].append(seat)
+  for s in seats:
+    rnd.shuffle(s)
+    s.sort(key=lambda seat: seat[0] >= front_rows)
+
+  # the people of each variant on the seats of its colour, front people first
+  placement = []
+  rest = variants.get(None, [])
+  for colour, v in enumerate(order):
+    group = variants[v]
+    rnd.shuffle(group)
+    group.sort(key=lambda p: not constraints[p][2])
+    n = min(len(group), len(seats[colour]))
+    placement += zip(seats[colour][:n], group[:n])
+    seats[colour] = seats[colour][n:]
+    rest += group[n:]
+
+  # the others on the seats left over, front people in front and the empty places last
+  left = [seat for s in seats for seat in s]
+  rnd.shuffle(left)
+  left.sort(key=lambda seat: seat[0] >= front_rows)
+  rnd.shuffle(rest)
+  rest.sort(key=lambda p: not constraints[p][2])
+  placement += zip(left, rest + [None] * (len(left) - len(rest)))
+  return placement
+
+
+def violations(seats, front_rows=2):
+  """returns a description of each violated constraint of a seating plan, a dict {(row, column): person}"""
+
+  found = []
+  for (row, column), person in sorted(seats.items()):
+    groups, variant, front = _constraints(person)
+    if front and row >= front_rows:
+      found.append('{} is not in the front rows'.format(person['name']))
+
+    # each pair once, from the seat that comes first
+    for dy, dx in ((0, 1), (1, -1), (1, 0), (1, 1)):
+      other = seats.get((row + dy, column + dx))
+      if other is None:
+        continue
+      other_groups, other_variant, _ = _constraints(other)
+      if groups & other_groups:
+        found.append('{} and {} sit next to each other'.format(person['name'], other['name']))
+      if dx * dy == 0 and variant is not None and variant == other_variant:
+        found.append('{} and {} next to each other write variant {}'.format(person['name'], other['name'], variant))
+  return found
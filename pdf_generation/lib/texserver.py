@@ -0,0 +1,154 @@
+"""
+A local compile server for tex documents.
+create_pdf sends its jobs to the server if one is running, and starts latexmk itself otherwise.
+If latexmk is replaced through the LATEXMK environment variable, the server is not used.
+The server runs xelatex directly, so a job doesn't pay for starting latexmk and Perl,
+and the precompiled preamble formats stay in the file system cache between the jobs.
+
+Start the server from one of the script directories (they contain the lib symlink):
+>> python3 -m lib.texserver -j 8
+"""
+
+import argparse
+import json
+import os
+import socket
+import socketserver
+import subprocess
+import threading
+
+from . import cache
+
+# the socket the server listens on
+SOCKET_FILE = os.path.join(cache.CACHE_DIR, 'texserver.sock')
+
+# maximum number of xelatex runs per document, until the cross references are stable
+MAX_RUNS = 5
+
+
+def run_xelatex(file_name, fmt=None):
+  """
+  compiles file_name.tex with xelatex, rerunning it until the aux file doesn't change any more.
+  Returns a tuple (return code, number of runs).
+
+  file_name:  an absolute path to the tex file (without .tex)
+  fmt:        the path of a format file with the preamble preloaded, or None
+  """
+
+  work_dir, base_name = os.path.split(file_name)
+  cmd = ['xelatex', '-interaction=batchmode', '-halt-on-error']
+  env = None
+
+  # with a precompiled format, xelatex skips the preamble of the document
+  if fmt:
+    fmt_dir, fmt_name = os.path.split(fmt)
+    cmd.append('-fmt=' + os.path.splitext(fmt_name)[0])
+    env = dict(os.environ, TEXFORMATS=fmt_dir + os.pathsep)
+  cmd.append(base_name)
+
+  # rerun like latexmk does, e.g. for the point totals of the exam class
+  aux_file = file_name + '.aux'
+  for runs in range(1, MAX_RUNS + 1):
+    aux = _read(aux_file)
+    retcode = subprocess.call(cmd, cwd=work_dir, env=env, stdout=subprocess.DEVNULL)
+    if retcode != 0 or _read(aux_file) == aux:
+      break
+  return retcode, runs
+
+
+def _read(file_name):
+  """returns the content of a file as bytes, or None if it doesn't exist"""
+  try:
+    with open(file_name, 'rb') as file:
+      return file.read()
+  except FileNotFoundError:
+    return None
+
+
+def submit(file_name, fmt=None, socket_file=SOCKET_FILE):
+  """
+  sends a compile job to the server and waits for the result.
+  Returns a tuple (return code, number of runs), or None if no server is running
+  or it died before replying, so the caller can fall back to latexmk.
+  """
+
+  # no server running
+  if not os.path.exists(socket_file):
+    return None
+
+  # one json line per request and reply
+  job = {'file': os.path.abspath(file_name), 'fmt': fmt}
+  with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+    try:
+      sock.connect(socket_file)
+      sock.sendall((json.dumps(job) + '\n').encode())
+      with sock.makefile('r') as reply:
+        line = reply.readline()
+    except OSError:
+      return None
+
+  # an empty or broken reply means the server is gone
+  try:
+    result = json.loads(line)
+    return result['retcode'], result['runs']
+  except (ValueError, KeyError, TypeError):
+    return None
+
+
+class _JobHandler(socketserver.StreamRequestHandler):
+  """handles a single compile job"""
+
+  def handle(self):
+    job = json.loads(self.rfile.readline())
+
+    # limit the number of parallel xelatex processes
+    with self.server.slots:
+      retcode, runs = run_xelatex(job['file'], job.get('fmt'))
+
+    reply = {'retcode': retcode, 'runs': runs}
+    self.wfile.write((json.dumps(reply) + '\n').encode())
+
+
+class TexServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+  """a unix socket server compiling up to jobs documents in parallel"""
+
+  daemon_threads = True
+
+  def __init__(self, socket_file=SOCKET_FILE, jobs=os.cpu_count()):
+
+    # remove the socket of a server that didn't shut down properly
+    os.makedirs(os.path.dirname(socket_file), exist_ok=True)
+    if os.path.exists(socket_file):
+      os.remove(socket_file)
+
+    self.slots = threading.BoundedSemaphore(jobs)
+    super().__init__(socket_file, _JobHandler)
+
+  def server_close(self):
+    super().server_close()
+    os.remove(self.server_address)
+
+
+def main():
+
+  # parse command line arguments
+  parser = argparse.ArgumentParser(
+    description='Runs a local server compiling the tex documents of the pdf_generation scripts.')
+  parser.add_argument('-j', '--jobs', default=os.cpu_count(), type=int,
+                   help='the number of xelatex processes running in parallel (default: number of CPUs)')
+  parser.add_argument('-s', '--socket', default=SOCKET_FILE,
+                   help='the unix socket to listen on')
+  args = parser.parse_args()
+
+  # serve until Ctrl-C
+  with TexServer(args.socket, args.jobs) as server:
+    print('Compile server listening on {}. Press Ctrl-C to stop.'.format(args.socket))
+    try:
+      server.serve_forever()
+    except KeyboardInterrupt:
+      pass
+
+
+# execute only if run as a script
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,44 @@
 A few library functions for pdf generation via python + LaTeX
 """
 
-import PyPDF2
 import os
+import re
 import shutil
+import sys
 import time
 import subprocess
+import concurrent.futures
+import functools
+import hashlib
+import queue
+import threading
+
+from . import cache
+from . import pdfmerge
+from . import profiling
+from . import texserver
+
+# the latexmk command. Can be replaced through the environment, e.g. by the benchmark's stub compiler.
+LATEXMK = os.environ.get('LATEXMK', 'latexmk')
+
+# matches a placeholder in a template, e.g. (NORMALFORM), (2A) or (STUDENT_NAME)
+PLACEHOLDER = re.compile(r'\([0-9]*[A-Z][A-Z0-9_]*\)')
+
+# matches the line latexmk prints for each latex run
+LATEXMK_RUN = re.compile(r"Run number \d+ of rule '\W*\w*latex\W*'")
+
+# inserted into the preamble of a batch document.
+# \nextvariant starts a new variant on a fresh page and resets the counters of common packages.
+BATCH_PREAMBLE = r"""
+\makeatletter
+\newcommand{\nextvariant}{%
+  \clearpage
+  \setcounter{page}{1}%
+  \@for\@tempa:=footnote,equation,figure,table,part,section,question,partno,subpart,subsubpart\do{%
+    \@ifundefined{c@\@tempa}{}{\setcounter{\@tempa}{0}}}%
+}
+\makeatother
+"""
 
 def read_template(file_name):
   """reads the tex content from a file and returns it as a string"""
@@ -28,86 +61,591 @@ def read_template(file_name):
   return template
 
 
-def create_pdf(tex_doc, file_name, keep_tex=True):
+class Template:
   """
-  renders a tex document as pdf
+  a tex document with placeholders such as (STUDENT_NAME).
+  The document is parsed once into literal segments and placeholder slots,
+  so rendering a variant is a single join instead of one str.replace per placeholder.
+  """
+
+  def __init__(self, text):
+    """splits text at the placeholders"""
+
+    self.segments = []
+    self.slots = []
+    k = 0
+    for match in PLACEHOLDER.finditer(text):
+      self.segments.append(text[k:match.start()])
+      self.slots.append(match.group())
+      k = match.end()
+    self.segments.append(text[k:])
+
+    # the placeholders, each one only once
+    self.placeholders = set(self.slots)
+
+    # the warnings printed so far, so each one is printed only once
+    self.warned = set()
+
+  def render(self, values):
+    """
+    returns the document with the placeholders replaced.
+    values is a dict mapping placeholders (including the brackets) to their replacements.
+    Text that looks like a placeholder but has no value, e.g. the (A) of a task list, is kept as it is.
+    Such slots and values without placeholder are reported as a warning, as they may be typos.
+    """
+
+    # report keys that don't match the placeholders
+    if values.keys() != self.placeholders:
+      self._warn('Placeholders without value, kept as text', self.placeholders - values.keys())
+      self._warn('Values without placeholder', values.keys() - self.placeholders)
+
+    # interleave the literal segments with the values
+    parts = [None] * (2 * len(self.slots) + 1)
+    parts[::2] = self.segments
+    parts[1::2] = [str(values[slot]) if slot in values else slot for slot in self.slots]
+    return ''.join(parts)
+
+  def _warn(self, message, placeholders):
+    """prints a warning about some placeholders, unless it was printed before"""
+
+    warning = '{}: {}'.format(message, ', '.join(sorted(placeholders)))
+    if placeholders and warning not in self.warned:
+      self.warned.add(warning)
+      print('Warning: ' + warning)
+
+
+def watch(paths, build, interval=1):
+  """
+  calls build whenever one of the files changes, until interrupted by Ctrl-C.
+  Directories in paths are watched including the files they contain.
+  Errors of a build are printed, so the previous output stays in place until the next successful build.
+  With the compile cache, only the variants that actually changed are compiled again.
+
+  paths:    a list of files and directories to be watched
+  build:    a function without arguments, creating the output
+  interval: the time in seconds between two checks
+  """
+
+  def snapshot():
+    """returns modification time and size of all watched files"""
+    stamps = {}
+    for path in paths:
+      file_names = [path]
+      if os.path.isdir(path):
+        file_names = [os.path.join(path, f) for f in os.listdir(path)]
+      for file_name in file_names:
+        if os.path.isfile(file_name):
+          stat = os.stat(file_name)
+          stamps[file_name] = (stat.st_mtime, stat.st_size)
+    return stamps
+
+  print('Watching {} for changes. Press Ctrl-C to stop.'.format(', '.join(paths)))
+  stamps = snapshot()
+  try:
+    while True:
+
+      # wait for a change
+      time.sleep(interval)
+      new_stamps = snapshot()
+      if new_stamps == stamps:
+        continue
+      stamps = new_stamps
+
+      # rebuild. Keep watching, even if the tex doc contains errors.
+      print('Change detected, rebuilding ...')
+      try:
+        build()
+      except Exception as e:
+        print('Build failed: {}'.format(e))
+
+  except KeyboardInterrupt:
+    pass
+
+
+def split_preamble(tex_doc):
+  """
+  splits a tex document at \\begin{document}.
+  Returns a tuple (preamble, body), or (None, tex_doc) if there is no \\begin{document}.
+  """
+
+  k = tex_doc.find('\\begin{document}')
+  if k < 0:
+    return None, tex_doc
+  return tex_doc[:k], tex_doc[k:]
+
+
+@functools.lru_cache(maxsize=None)
+def _xelatex_version():
+  """returns the first line of xelatex --version, or None if xelatex can't be run"""
+
+  try:
+    output = subprocess.run(['xelatex', '--version'], capture_output=True, text=True).stdout
+  except OSError:
+    return None
+  return output.partition('\n')[0]
+
+# the preambles whose format failed in this process, so they aren't retried for every variant
+_failed_formats = set()
+
+
+def preamble_format(tex_doc, cache_dir=cache.CACHE_DIR, retry=False):
+  """
+  returns the path of a XeLaTeX format file with the preamble of tex_doc preloaded.
+  The format is dumped with mylatexformat on first use and then kept, keyed by a hash of the preamble.
+  Returns None if the preamble can't be dumped (e.g. because fontspec loaded a font),
+  in which case the document should be compiled as usual.
+
+  A failed dump is remembered for the installed xelatex version, so it is retried after an update.
+  retry ignores the failures of earlier runs, e.g. after installing mylatexformat.
+  """
+
+  # documents without preamble can't profit from a format
+  preamble = split_preamble(tex_doc)[0]
+  if preamble is None:
+    return None
+
+  # formats are named by the hash of their preamble
+  fmt_dir = os.path.join(cache_dir, 'formats')
+  name = 'preamble-' + hashlib.sha256(preamble.encode()).hexdigest()[:16]
+  fmt_file = os.path.join(fmt_dir, name + '.fmt')
+  failed_file = os.path.join(fmt_dir, name + '.failed')
+
+  # use the format dumped in an earlier run. Don't retry preambles that failed before with this xelatex.
+  if os.path.isfile(fmt_file):
+    return fmt_file
+  if name in _failed_formats:
+    return None
+  version = _xelatex_version()
+  if version is None:
+    return None
+  if not retry and os.path.isfile(failed_file):
+    with open(failed_file) as file:
+      if file.read() == version:
+        return None
+
+  # write the preamble as a document of its own
+  os.makedirs(fmt_dir, exist_ok=True)
+  with open(os.path.join(fmt_dir, name + '.tex'), 'w') as file:
+    file.write(preamble + '\\begin{document}\n\\end{document}\n')
+
+  # dump the format. mylatexformat reads the preamble up to \begin{document}
+  cmd = ['xelatex', '-ini', '-interaction=batchmode', '-jobname=' + name,
+    '&xelatex', 'mylatexformat.ltx', name + '.tex']
+  try:
+    retcode = subprocess.call(cmd, cwd=fmt_dir, stdout=subprocess.DEVNULL)
+  except OSError:
+    return None
+
+  # a dump killed by a signal (e.g. Ctrl-C) may well succeed next time
+  if retcode < 0:
+    return None
+
+  # remember a failure, so we don't try again for every variant
+  if retcode != 0 or not os.path.isfile(fmt_file):
+    _failed_formats.add(name)
+    with open(failed_file, 'w') as file:
+      file.write(version)
+    return None
+  return fmt_file
+
+
+def create_pdf(tex_doc, file_name, keep_tex=True, fmt=None):
+  """
+  renders a tex document as pdf, on the compile server if one is running, otherwise with latexmk.
+  Returns the number of latex runs.
 
   tex_doc:    a string containing the TeX source
   file_name:  a string containing the output file name (without .pdf)
   keep_tex: a boolean indicating whether the tex file shall be kept
+  fmt:        the path of a format file with the preamble preloaded (see preamble_format), or None
   """
 
   # create tex file
   with open(file_name + ".tex", 'w') as file:
     file.write(tex_doc)
 
-  # generate pdf from tex file
+  # if a compile server is running, let it do the job (see texserver).
+  # The server runs xelatex, so it is skipped when latexmk is replaced, e.g. by the stub compiler.
+  result = None
+  if LATEXMK == 'latexmk':
+    result = texserver.submit(file_name, fmt)
+  if result is not None:
+    retcode, runs = result
+    if retcode != 0:
+      raise ValueError('Error {} compiling {}.tex on the compile server'.format(retcode, file_name))
+
+  # otherwise generate pdf from tex file
   # latexmk automatically compiles twice, 
   # so e.g. a score generated by the exams package will be rendered correctly
-  cmd = ['latexmk', '-xelatex', '-silent', file_name]
-  proc = subprocess.Popen(cmd)
-  proc.communicate()
+  # latexmk writes its output to the working dir, so we run it next to the tex file
+  else:
+    work_dir, base_name = os.path.split(file_name)
+    cmd = [LATEXMK, '-xelatex', '-silent']
+    env = None
+
+    # with a precompiled format, xelatex skips the preamble of the document
+    if fmt:
+      fmt_dir, fmt_name = os.path.split(fmt)
+      cmd.append('-xelatex=xelatex -fmt={} %O %S'.format(os.path.splitext(fmt_name)[0]))
+      env = dict(os.environ, TEXFORMATS=fmt_dir + os.pathsep)
+
+    cmd.append(base_name)
+    proc = subprocess.Popen(cmd, cwd=work_dir or None, env=env,
+      stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+
+    # pass the output on, counting the latex runs on the way
+    output = proc.communicate()[0].decode(errors='replace')
+    sys.stdout.write(output)
+    runs = len(LATEXMK_RUN.findall(output))
 
-  # check, if any latex errors
-  retcode = proc.returncode
-  if retcode != 0:
+    # check, if any latex errors
+    retcode = proc.returncode
+    if retcode != 0:
 
-    # print error and halt
-    raise ValueError('Error {} executing command: {}'.format(retcode, ' '.join(cmd)))
+      # print error and halt
+      raise ValueError('Error {} executing command: {}'.format(retcode, ' '.join(cmd)))
 
   # eventually delete tex file
   if not keep_tex:
     os.remove(file_name + ".tex")
 
+  return runs
 
-def create_pdf_series(template, args, variants, src_dir=None):
+
+def add_series_arguments(parser):
+  """adds the command line options of create_pdf_series to an ArgumentParser"""
+
+  parser.add_argument('-j', '--jobs', default=os.cpu_count(), type=int,
+                   help='the number of LaTeX processes running in parallel (default: number of CPUs)')
+  parser.add_argument('--no-cache', action='store_true',
+                   help='compile all variants, even if an unchanged pdf is in the cache, and retry failed formats')
+  parser.add_argument('--no-format', action='store_true',
+                   help="don't precompile the preamble into a format file")
+  parser.add_argument('--batch', action='store_true',
+                   help='compile all variants in a single LaTeX run instead of one run per variant')
+  parser.add_argument('--optimize', action='store_true',
+                   help='store identical objects (e.g. fonts, images) only once in the merged pdf')
+  parser.add_argument('--watch', action='store_true',
+                   help='keep running and rebuild whenever the input files change')
+  parser.add_argument('--profile', action='store_true',
+                   help='write a timing report of all stages and variants to <output>.profile.json')
+
+
+def list_resources(src_dir, names=None, exclude=()):
+  """
+  returns the resources in src_dir as a list of tuples (absolute path, name relative to src_dir).
+  names are the paths of the resources relative to src_dir. Files that don't exist are left out.
+  If names is None, all files (but no sub directories) in src_dir are listed,
+  except those whose names start with one of the prefixes in exclude.
+  """
+
+  src_dir = os.path.abspath(src_dir)
+  if names is None:
+    names = [f for f in os.listdir(src_dir) if not f.startswith(exclude)]
+
+  resource_files = []
+  for name in names:
+    full_file_name = os.path.join(src_dir, name)
+    if os.path.isfile(full_file_name):
+      resource_files.append((full_file_name, os.path.normpath(name)))
+  return resource_files
+
+
+def copy_resources(resource_files, dst_dir):
+  """copies the resources (tuples of path and relative name) to dst_dir, keeping their sub directories"""
+
+  for full_file_name, name in resource_files:
+    dst_file = os.path.join(dst_dir, name)
+    os.makedirs(os.path.dirname(dst_file), exist_ok=True)
+    shutil.copy(full_file_name, dst_file)
+
+
+def _compile_variant(tex_doc, work_dir, resource_files=(), compile_cache=None, resources='', fmt=None):
+  """
+  compiles a single variant in its own working directory.
+  Returns the path of the pdf and a profiling record of the compile stage.
+  If the variant is found in the compile cache, the cached pdf is returned instead.
+  This runs in a worker process of create_pdf_series, so all paths must be absolute.
+  """
+
+  start = profiling.snapshot()
+  record = {'stage': 'compile', 'cached': False, 'runs': 0}
+
+  # check the cache first
+  if compile_cache:
+    key = compile_cache.key(tex_doc, resources, LATEXMK)
+    cached = compile_cache.lookup(key)
+    if cached:
+      record['cached'] = True
+      return cached, profiling.measure(start, record)
+
+  # each variant gets a fresh directory, so parallel latex runs don't share aux files
+  os.makedirs(work_dir)
+  copy_resources(resource_files, work_dir)
+
+  # create pdf
+  file_name = os.path.join(work_dir, 'variant')
+  record['runs'] = create_pdf(tex_doc, file_name, fmt=fmt)
+
+  # store the result for the next run
+  if compile_cache:
+    compile_cache.store(key, file_name + '.pdf')
+  return file_name + '.pdf', profiling.measure(start, record)
+
+
+def optimize_pdf(file_name):
+  """
+  rewrites a pdf file in place, storing identical embedded objects only once.
+  Returns the number of bytes saved. If the rewrite isn't smaller, the original is kept and 0 returned.
+  """
+
+  # write the optimized copy next to the original, then replace it
+  temp_name = file_name + '.optimized'
+  pdfmerge.optimize(file_name, temp_name)
+  saved = os.path.getsize(file_name) - os.path.getsize(temp_name)
+  if saved <= 0:
+    os.remove(temp_name)
+    return 0
+  os.replace(temp_name, file_name)
+  return saved
+
+
+def batch_document(variants):
+  """
+  joins the bodies of all variants into a single tex document, using the preamble of the first one.
+  The variants must share their preamble. They are separated by \\nextvariant (see BATCH_PREAMBLE).
+  """
+
+  preamble = None
+  bodies = []
+  for v in variants:
+
+    # all variants must be compiled with the same preamble
+    p, body = split_preamble(v)
+    if p is None:
+      raise ValueError('Batch mode needs a tex document with \\begin{document}')
+    if preamble is None:
+      preamble = p
+    elif p != preamble:
+      raise ValueError('Batch mode needs all variants to share the preamble')
+
+    # strip \\begin{document} and everything from \\end{document}
+    bodies.append(body[len('\\begin{document}'):body.rfind('\\end{document}')])
+
+  # nothing to join
+  if preamble is None:
+    raise ValueError('Batch mode needs at least one variant')
+
+  return (preamble + BATCH_PREAMBLE + '\\begin{document}'
+    + '\\nextvariant\n'.join(bodies) + '\\end{document}\n')
+
+
+def _pipe(iterable, maxsize):
+  """
+  iterates on iterable in a separate thread and yields its items, handed over through a bounded queue.
+  Producing the items overlaps with consuming them, while at most maxsize items wait in between.
+  Exceptions of the producer are raised in the consumer.
+  """
+
+  items = queue.Queue(maxsize)
+  stop = threading.Event()
+  end = object()
+
+  def put(item):
+    """puts an item into the queue, unless the consumer stopped. Returns False if it did."""
+    while not stop.is_set():
+      try:
+        items.put(item, timeout=0.1)
+        return True
+      except queue.Full:
+        pass
+    return False
+
+  def produce():
+    try:
+      for item in iterable:
+        if not put((item, None)):
+          return
+      put((end, None))
+    except BaseException as e:
+      put((end, e))
+
+  threading.Thread(target=produce, daemon=True).start()
+  try:
+    while True:
+      item, error = items.get()
+      if item is end:
+        if error:
+          raise error
+        return
+      yield item
+
+  # let the producer know, in case the consumer stops early
+  finally:
+    stop.set()
+
+
+def _compile_series(variants, args, temp_dir, resource_files, compile_cache, resources, profile):
+  """
+  compiles the variants in a pool of worker processes.
+  Rendering, compiling and merging run as a pipeline: the variants are rendered in a thread,
+  submitted to the pool by another one, and the pdf files are yielded in the order of the variants,
+  each one as soon as it is ready. Bounded queues keep the number of variants in flight at 2 * jobs,
+  so memory stays flat for any number of variants.
+  """
+
+  # number of parallel latex runs. Scripts without a --jobs option compile one by one.
+  jobs = getattr(args, 'jobs', 1) or 1
+  window = 2 * jobs
+
+  with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+
+    def submit(rendered):
+      """submits one compile job per variant. Counter names the temp directories."""
+      for counter, v in rendered:
+        work_dir = os.path.join(temp_dir, str(counter))
+
+        # variants usually share the preamble, so the format is dumped only once
+        fmt = None
+        if not getattr(args, 'no_format', False):
+          with profile.stage('format', variant=counter):
+            fmt = preamble_format(v, retry=getattr(args, 'no_cache', False))
+
+        yield counter, executor.submit(
+          _compile_variant, v, work_dir, resource_files, compile_cache, resources, fmt)
+
+    # the stages, connected by bounded queues
+    rendered = _pipe(enumerate(profile.timed('render', variants), 1), window)
+    submitted = _pipe(submit(rendered), window)
+
+    # wait for the variants in their original order
+    for job in submitted:
+      yield _collect(job, profile)
+
+
+def _collect(job, profile):
+  """waits for a compile job (a tuple of variant number and future) and returns its pdf file"""
+
+  counter, future = job
+  pdf_file, record = future.result()
+  record['variant'] = counter
+  profile.add(record)
+  return pdf_file
+
+
+def create_pdf_series(template, args, variants, src_dir=None, bookmarks=None, file_names=None, resource_names=None):
   """
   creates a single pdf file, as a merged series of individualized templates.
+  The variants are compiled in parallel by a pool of args.jobs worker processes,
+  each one in its own directory. Each pdf is appended to the output as soon as it is ready,
+  so the merged pdf keeps the order of the variants.
+  Unchanged variants are taken from the compile cache, unless args.no_cache is set.
+  args.no_cache also retries preamble formats that failed in earlier runs.
+  The preamble is loaded from a precompiled format file, unless args.no_format is set.
+  If args.batch is set, all variants are joined into one document and compiled in a single run.
+  If args.optimize is set, identical objects in the merged pdf are stored only once.
+  If args.profile is set, a timing report of all stages is written to <output>.profile.json.
 
-  template: a string containing a TeX document with placeholders
-  args:     a Namespace containing command line options such as the output file name
-  variants: a generator that will produce the variants by replacing the placeholders
+  template:   a string containing a TeX document with placeholders
+  args:       a Namespace containing command line options such as the output file name
+  variants:   a generator that will produce the variants by replacing the placeholders
+  src_dir:    a directory with resources (e.g. images) to be copied next to each variant.
+              The output file and the files named after it (e.g. the profile) are no resources.
+  resource_names: the resources to be copied from src_dir, as paths relative to it,
+              e.g. the images a document refers to. By default, all files directly in src_dir are copied.
+              Only the listed files are part of the cache key.
+  bookmarks:  a list of titles, one per variant, for the outline of the merged pdf.
+              In batch mode, the variants are not merged, so there is no outline.
+  file_names: a list of pdf files, one per variant. If given, the variants are not merged into args.output,
+              but each one is copied to its file. Batch mode and optimization don't apply.
   """
 
-  # we need a counter to name the temp PDF files
-  counter = 0
+  # timing of the stages
+  profile = profiling.Profile()
+  start = profiling.snapshot()
 
-  # Merger to collect the temp PDF files
-  merger = PyPDF2.PdfFileMerger()
+  # the merged pdf is written next to the output and renamed when complete
+  output = os.path.abspath(args.output)
+  part_file = output + '.part'
+  if file_names:
+    file_names = [os.path.abspath(f) for f in file_names]
 
-  # create temp directory
-  temp_dir = "temp" + str(time.time())
+  # list the resources once for all variants. The output may be written to src_dir as well.
+  resource_files = []
+  if src_dir:
+    resource_files = list_resources(src_dir, resource_names, exclude=os.path.basename(output))
+
+  # the resources are part of the cache key, so hash them once for all variants
+  compile_cache = None
+  resources = ''
+  if not getattr(args, 'no_cache', False):
+    compile_cache = cache.CompileCache()
+    resources = cache.hash_resources(resource_files)
+
+  # create temp directory. Workers get absolute paths, as we change the working dir below.
+  temp_dir = os.path.abspath("temp" + str(time.time()))
   os.makedirs(temp_dir)
+  try:
 
-  # copy resources, if necessary
-  if src_dir:
-    for file_name in os.listdir(src_dir):
-      full_file_name = os.path.join(src_dir, file_name)
-      if os.path.isfile(full_file_name):
-          shutil.copy(full_file_name, temp_dir)
+    # change working dir, as the variants generators may rely on it
+    cwd = os.getcwd()
+    os.chdir(temp_dir)
+    try:
 
-  # change working dir
-  os.chdir(temp_dir)
+      # separate files: each pdf is copied to its file as soon as it is ready
+      if file_names:
+        pdf_files = _compile_series(variants, args, temp_dir, resource_files, compile_cache, resources, profile)
+        for counter, pdf_file in enumerate(pdf_files, 1):
+          shutil.copyfile(pdf_file, file_names[counter - 1])
 
-  # iterate on the variants
-  for v in variants:
+      # batch mode: one latex run for all variants, so there is nothing to merge
+      elif getattr(args, 'batch', False):
+        tex_doc = batch_document(profile.timed('render', variants))
+        fmt = None
+        if not getattr(args, 'no_format', False):
+          with profile.stage('format'):
+            fmt = preamble_format(tex_doc, retry=getattr(args, 'no_cache', False))
+        pdf_file, record = _compile_variant(
+          tex_doc, os.path.join(temp_dir, 'batch'), resource_files, compile_cache, resources, fmt)
+        profile.add(record)
+        shutil.copyfile(pdf_file, part_file)
+
+      # otherwise, each pdf is merged as soon as it is ready and closed again
+      else:
+        with open(part_file, 'wb') as file:
+          merger = pdfmerge.StreamMerger(file)
+          pdf_files = _compile_series(variants, args, temp_dir, resource_files, compile_cache, resources, profile)
+          for counter, pdf_file in enumerate(pdf_files, 1):
+            with profile.stage('merge', variant=counter):
+              merger.append(pdf_file, bookmarks[counter - 1] if bookmarks else None)
+          with profile.stage('merge'):
+            merger.close()
+
+    finally:
+      os.chdir(cwd)
 
-    # increment counter
-    counter += 1
+    # post-merge pass, before the result becomes visible
+    if getattr(args, 'optimize', False) and not file_names:
+      with profile.stage('optimize'):
+        saved = optimize_pdf(part_file)
+      print('{}: {} bytes saved by storing identical objects once'.format(args.output, saved))
 
-    # create pdf
-    create_pdf(v, str(counter))
+    # replace the output file in case it exists
+    if not file_names:
+      os.replace(part_file, output)
 
-    # append temp file to merger
-    merger.append(str(counter) + '.pdf')
+  # clean up, after a failed build as well. With --watch, every tex error would leave a copy behind.
+  finally:
+    shutil.rmtree(temp_dir, ignore_errors=True)
+    if os.path.exists(part_file):
+      os.remove(part_file)
 
-  # CSV parsing complete
-  # delete output file in case it exists
-  if os.path.isfile(args.output):
-    os.remove(args.output)
+  # keep the cache within its size limit
+  if compile_cache:
+    compile_cache.evict()
 
-  # merge the pdf files, write the result and clean up
-  os.chdir("..")
-  with open(args.output, 'wb') as file:
-    merger.write(file)
-    shutil.rmtree(temp_dir)
\ No newline at end of file
+  # report the timing
+  profile.add(profiling.measure(start, {'stage': 'total'}))
+  if getattr(args, 'profile', False):
+    profile.write(args.output + '.profile.json')
+    print(profile.summary())
@@ -9,6 +9,17 @@ For help, run the script from command line with -h
 example:
 >> python3 sitzplan.py example.csv -e mac-roman --hspacing [3,3] -t Sitzplan -o Sitzplan
 
+Several rooms are rendered in one run, if the CSV file has a room column,
+or if a directory or a glob pattern of CSV files is given (one room per file).
+The plans are compiled in parallel and merged into one pdf with a bookmark per room:
+>> python3 sitzplan.py 'pruefung/*.csv' -t 'Sitzplan Abitur' -o Abitur
+
+People with an empty row and column get a seat assigned automatically (see lib/seating.py).
+The optional columns apart, variant and front hold their constraints:
+people sharing an apart group don't sit next to each other, neighbours don't write the same variant,
+and people marked as front sit in the front rows. --grid gives the size of the room:
+>> python3 sitzplan.py klausur.csv --grid 5x6 -t 'Klausur 9b'
+
 Prerequisits:
 - XeTeX
 - python 3.x
@@ -23,16 +34,20 @@ import PyPDF2
 import csv
 import locale
 import ast
+import glob
 
 # symlink to library contained in repository
 from lib import util
+from lib import profiling
+from lib import seating
 
 def parse_args():
   """parse command line arguments and return them as Namespace"""
 
   parser = argparse.ArgumentParser(
     description='Generates a Seating Plan, e.g. for a class room, based on a CSV spread sheet and generates a PDF.')
-  parser.add_argument('csvfile', help='the csv file containing the input')
+  parser.add_argument('csvfile',
+                   help='the csv file containing the input, or a directory or glob pattern of csv files for several rooms')
   parser.add_argument('-e', '--encoding', default=locale.getpreferredencoding(),
     help='the character encoding of the CSV file, e.g. mac-roman.')
   parser.add_argument('-o', '--output',
@@ -41,95 +56,221 @@ def parse_args():
                    help='the document title')
   parser.add_argument('--hspacing', default='',
                    help='Horizontal spacing in milimeters, e.g. as [3,0,0,3] for a plan with 5 columns')
+  parser.add_argument('--grid',
+                   help='the size of the room as ROWSxCOLUMNS, e.g. 5x6, for people without a seat')
+  parser.add_argument('--front-rows', default=2, type=int,
+                   help='the number of rows counting as front rows for the seat assignment')
+  parser.add_argument('--seed', default=0, type=int,
+                   help='the seed for the seat assignment')
+  util.add_series_arguments(parser)
   return parser.parse_args()
 
 
-def main():
+def csv_files(path):
+  """returns the CSV files given on the command line: a file, a directory or a glob pattern"""
 
-  # parse command line arguments 
-  args = parse_args()
+  if os.path.isdir(path):
+    return sorted(glob.glob(os.path.join(path, '*.csv')))
+  if glob.has_magic(path):
+    return sorted(glob.glob(path))
+  return [path]
 
-  # read the tex doc
-  tex_doc = util.read_template(os.path.realpath(__file__))
 
-  # replace the document title
-  tex_doc = tex_doc.replace('(TITLE)', args.title)
+def read_seats(file_name, encoding):
+  """
+  reads the CSV file and returns its rooms as a dict {room: (seats, unplaced)}, in the order of the file.
+  The seats are a dict of people, indexed by their seat (row, column).
+  unplaced is a list of the people with an empty row and column, who still need a seat.
+  Without a room column, the file is a single room named after the file.
+  Raises IndexError if two people sit on the same place.
+  """
 
-  # read the CSV doc
-  with open(args.csvfile, encoding=args.encoding, newline='') as csvfile:
+  default_room = os.path.splitext(os.path.basename(file_name))[0]
+  rooms = {}
+  with open(file_name, encoding=encoding, newline='') as csvfile:
     reader = csv.DictReader(csvfile, delimiter=';')
-    
-    # convert strings to integers
-    people = []
     for p in reader:
+      room = p.get('room') or default_room
+      seats, unplaced = rooms.setdefault(room, ({}, []))
+
+      # people without a seat get one assigned later
+      if not p['row'] and not p['column']:
+        unplaced.append(p)
+        continue
+
+      # convert strings to integers
       p['row'] = int(p['row'])
       p['column'] = int(p['column'])
-      people.append(p)
 
-  # determine height and width of the matrix
-  height = max([p['row'] for p in people]) + 1
-  width = max([p['column'] for p in people]) + 1
+      # check for consistency
+      seat = (p['row'], p['column'])
+      if seat in seats:
+        raise IndexError("Two people can not sit on the same place: {} and {} in room {}, row {}, column {} ({}, line {})".format(
+          seats[seat]['name'], p['name'], room, p['row'], p['column'], file_name, reader.line_num))
+      seats[seat] = p
 
-  # parse horizontal spacing (default 3mm)
-  hspacing = [3] * (width-1)
-  if args.hspacing != '':
-    hspacing = ast.literal_eval(args.hspacing)
+  return rooms
+
+
+def read_rooms(path, encoding):
+  """returns the rooms of all CSV files as a list of tuples (room, seats, unplaced)"""
+
+  rooms = []
+  for file_name in csv_files(path):
+    rooms.extend((room, seats, unplaced) for room, (seats, unplaced) in read_seats(file_name, encoding).items())
+  if not rooms:
+    raise ValueError('No seats found in ' + path)
+  return rooms
+
+
+def assign_seats(room, seats, unplaced, args):
+  """assigns seats to the unplaced people of a room and adds them to seats. Violated constraints are printed."""
+
+  if not args.grid:
+    raise ValueError('{} people in room {} have no seat. Please give the size of the room with --grid.'.format(
+      len(unplaced), room))
+  seats.update(seating.assign(unplaced, seating.parse_grid(args.grid), seats, args.front_rows, args.seed))
+  for violation in seating.violations(seats, args.front_rows):
+    print('{}: {}'.format(room, violation))
+
+
+def person_node(person):
+  """returns the content of a matrix node for a person"""
+
+  # add person
+  node = ['{', person['name'], r"\\"]
+
+  # create hands, if given
+  if 'hands' in person:
+    hands = int(person['hands'])
+    node.append(hands * r"{\scalebox{.7}{\rotatebox[x=0mm, y=4mm]{-90}{\HandLeft}}}")
+    node.append("~~")
+
+  # add string, if given
+  if 'string' in person:
+    node.append(person['string'])
+
+  # end this node
+  node.append('}')
+  return ''.join(node)
+
+
+def seat_matrix(seats, hspacing=None):
+  """
+  returns the body of the tikz matrix for the seats, a dict of people indexed by (row, column).
+  hspacing is a list of the horizontal spacings in millimeters between the columns (default 3mm).
+  """
+
+  # determine height and width of the matrix
+  height = max(row for row, column in seats) + 1
+  width = max(column for row, column in seats) + 1
+  if hspacing is None:
+    hspacing = [3] * (width-1)
 
   # create the matrix cell by cell
-  matrix = ""
+  matrix = []
   for y in range(height):
     for x in range(width):
 
       # if not the first column, add the column separator
       if x > 0:
-        matrix += "&"
-        
+        matrix.append("&")
+
         # if on the first row, add spacing
         if y == 0:
-          matrix += ("[" + str(hspacing[x-1]) + "mm]")
+          matrix.append("[" + str(hspacing[x-1]) + "mm]")
 
-      # find the eventual person sitting on this place
-      l = [p for p in people if p['column'] == x and p['row'] == y]
+      # add the person sitting on this place, if any
+      person = seats.get((y, x))
+      if person is not None:
+        matrix.append(person_node(person))
 
-      # check for consistency
-      if len(l) > 1:
-        raise IndexError("Two people can not sit on the same place")
+    # end one line
+    matrix.append("\\\\\n")
 
-      # check if a person sits here
-      if len(l) == 1:
-        person = l[0]
+  return ''.join(matrix)
 
-        # add person  
-        matrix += '{'
-        matrix += (person['name'] + r"\\")
 
-        # create hands, if given
-        if 'hands' in person:
-          hands = int(person['hands'])
-          matrix += hands * r"{\scalebox{.7}{\rotatebox[x=0mm, y=4mm]{-90}{\HandLeft}}}"
-          matrix += "~~"
+def build(args):
+  """reads the tex doc and the CSV files and renders the seating plans"""
 
-        # add string, if given
-        if 'string' in person:
-          matrix += person['string']
+  # timing of the stages
+  profile = profiling.Profile()
+  start = profiling.snapshot()
 
-        # end this node
-        matrix += '}'
+  # read the tex doc
+  tex_template = util.read_template(os.path.realpath(__file__))
+  template = util.Template(tex_template)
 
-    # end one line
-    matrix += "\\\\\n"
+  # read the CSV docs and find seats for the people without one
+  rooms = read_rooms(args.csvfile, args.encoding)
+  for room, seats, unplaced in rooms:
+    if unplaced:
+      assign_seats(room, seats, unplaced, args)
 
-  # replace the matrix in the tex doc
-  tex_doc = tex_doc.replace('(MATRIX)', matrix)
+  # parse horizontal spacing (default 3mm)
+  hspacing = None
+  if args.hspacing != '':
+    hspacing = ast.literal_eval(args.hspacing)
 
-  # check output file name
+  # several rooms: one plan per room, compiled in parallel and merged with a bookmark per room
+  if len(rooms) > 1:
+    plans = (template.render({'(TITLE)': args.title + ': ' + room, '(MATRIX)': seat_matrix(seats, hspacing)})
+      for room, seats, unplaced in rooms)
+    series_args = argparse.Namespace(**vars(args))
+    series_args.output = args.output + '.pdf'
+    util.create_pdf_series(tex_template, series_args, plans, bookmarks=[room for room, seats, unplaced in rooms])
+    return
+
+  # insert the document title and the matrix in the tex doc
+  tex_doc = template.render({'(TITLE)': args.title, '(MATRIX)': seat_matrix(rooms[0][1], hspacing)})
+  profile.add(profiling.measure(start, {'stage': 'render'}))
+
+  # load the preamble from a precompiled format, if possible
+  fmt = None
+  if not args.no_format:
+    with profile.stage('format'):
+      fmt = util.preamble_format(tex_doc, retry=args.no_cache)
+
+  # render pdf file
+  with profile.stage('compile') as record:
+    record['runs'] = util.create_pdf(tex_doc, args.output, fmt=fmt)
+
+  # store identical objects only once
+  if args.optimize:
+    with profile.stage('optimize'):
+      saved = util.optimize_pdf(args.output + '.pdf')
+    print('{}.pdf: {} bytes saved by storing identical objects once'.format(args.output, saved))
+
+  # report the timing
+  profile.add(profiling.measure(start, {'stage': 'total'}))
+  if args.profile:
+    profile.write(args.output + '.profile.json')
+    print(profile.summary())
+
+
+def main():
+
+  # parse command line arguments 
+  args = parse_args()
+
+  # check output file name. For a directory or glob pattern, the output is named after the directory.
   if not args.output:
     args.output = args.csvfile
+    if os.path.isdir(args.csvfile):
+      args.output = os.path.normpath(args.csvfile)
+    elif glob.has_magic(args.csvfile):
+      args.output = os.path.dirname(args.csvfile) or 'sitzplan'
 
   # render and open pdf file
-  util.create_pdf(tex_doc, args.output)
+  build(args)
   os.system('open ' + args.output + ".pdf")
 
+  # rebuild when the tex doc or the CSV files change. A directory is watched for new files as well.
+  if args.watch:
+    inputs = [args.csvfile] if os.path.isdir(args.csvfile) else csv_files(args.csvfile)
+    util.watch([os.path.realpath(__file__)] + inputs, lambda: build(args))
+
   
 # execute only if run as a script
 if __name__ == "__main__":
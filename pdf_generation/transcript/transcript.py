@@ -9,6 +9,15 @@ For help, run the script from command line with -h
 example:
 >> python3 transcript.py Abgaben.csv -e utf8
 
+The scores can be exported without running LaTeX, as CSV or JSON (by file extension):
+>> python3 transcript.py Abgaben.csv -e utf8 -x noten.csv --no-pdf
+For CSV, the statistics per assignment and the distribution of the marks go to noten.assignments.csv
+and noten.marks.csv.
+
+With -d, there is a pdf per student in the given directory. Only the students whose line in the CSV file
+changed since the last run are compiled again, e.g. after a late submission:
+>> python3 transcript.py Abgaben.csv -e utf8 -d zeugnisse
+
 Prerequisits:
 - XeLaTeX
 - python 3.x
@@ -17,10 +26,16 @@ Prerequisits:
 """
 
 import argparse
+import bisect
+import collections
+import functools
 import os
 import csv
+import hashlib
+import json
 import locale
 import re
+import statistics
 
 # symlink to library contained in repository
 from lib import util
@@ -43,6 +58,27 @@ SCORE = re.compile(r'(Zusatzp|P)unkte*')
 # regex pattern, matches any column regarded as part of the name
 STUDENT_NAME = re.compile(r'Vorname|Nachname|Klasse')
 
+# grading schemes: ascending thresholds of the percentage, and the marks from the lowest to the highest.
+# A percentage below the first threshold gets the first mark, one reaching the last threshold the last mark.
+SCHEMES = {
+  # marks 1 to 6, as in Sekundarstufe I
+  'noten': ([10, 45, 60, 75, 90],
+    ['6 (ungenügend)', '5 (mangelhaft)', '4 (ausreichend)', '3 (befriedigend)', '2 (gut)', '1 (sehr gut)']),
+
+  # 0 to 15 points, as in the Oberstufe
+  'punkte': ([9, 18, 27, 36, 45, 50, 55, 60, 65, 70, 75, 80, 85, 90, 95],
+    ['0 Punkte (6)', '1 Punkte (5-)', '2 Punkte (5)', '3 Punkte (5+)', '4 Punkte (4-)', '5 Punkte (4)',
+     '6 Punkte (4+)', '7 Punkte (3-)', '8 Punkte (3)', '9 Punkte (3+)', '10 Punkte (2-)', '11 Punkte (2)',
+     '12 Punkte (2+)', '13 Punkte (1-)', '14 Punkte (1)', '15 Punkte (1+)']),
+}
+
+# the role of a column, determined once from its header:
+# - is_name: the cell is part of the student's name
+# - is_start: the column starts a block. heading is the table line with project name and date.
+# - is_end: the column ends a block with a score. suffix is the maximum score, e.g. "/ 3".
+#   block is the project name of the block, points its maximum score (None for additional scores).
+Column = collections.namedtuple('Column', 'is_name is_start is_end heading suffix block points')
+
 
 def parse_args():
   """parse command line arguments and return them as Namespace"""
@@ -56,52 +92,90 @@ def parse_args():
     help='the name of the student. If empty, transcripts for all students will be generated.')
   parser.add_argument('-o', '--output', default=__file__+'.pdf',
                    help='the output file name')
+  parser.add_argument('-d', '--directory',
+                   help='write a pdf per student to this directory, rebuilding only the students whose line changed')
+  parser.add_argument('--scheme', default='noten',
+                   help='the grading scheme: noten (1 to 6), punkte (0 to 15) or a JSON file with thresholds and marks')
+  parser.add_argument('-x', '--export',
+                   help='export the scores, marks and statistics to a .csv or .json file')
+  parser.add_argument('--no-pdf', action='store_true',
+                   help="don't create the pdf, e.g. when only exporting the scores")
+  util.add_series_arguments(parser)
   return parser.parse_args()
 
 
-def compute_mark(percentage):
+def load_scheme(name):
+  """
+  returns a grading scheme as a tuple (thresholds, marks): one of SCHEMES, or read from a JSON file
+  with the keys thresholds and marks, e.g. {"thresholds": [50], "marks": ["nicht bestanden", "bestanden"]}
+  """
+
+  if name in SCHEMES:
+    return SCHEMES[name]
+  with open(name, encoding='utf8') as file:
+    scheme = json.load(file)
+  thresholds, marks = scheme['thresholds'], scheme['marks']
+  if len(marks) != len(thresholds) + 1 or thresholds != sorted(thresholds):
+    raise ValueError(name + ': the thresholds must be ascending, with one mark more than thresholds')
+  return thresholds, marks
+
+
+def compute_mark(percentage, scheme=SCHEMES['noten']):
   """computes the mark according to the percentage"""
-  if percentage <10: return '6 (ungenügend)'
-  if percentage <45: return '5 (mangelhaft)'
-  if percentage <60: return '4 (ausreichend)'
-  if percentage <75: return '3 (befriedigend)'
-  if percentage <90: return '2 (gut)'
-  return '1 (sehr gut)'
-
-"""  if percentage <9: return '0 Punkte (6)'
-  if percentage <18: return '1 Punkte (5-)'
-  if percentage <27: return '2 Punkte (5)'
-  if percentage <36: return '3 Punkte (5+)'
-  if percentage <45: return '4 Punkte (4-)'
-  if percentage <50: return '5 Punkte (4)'
-  if percentage <55: return '6 Punkte (4+)'
-  if percentage <60: return '7 Punkte (3-)'
-  if percentage <65: return '8 Punkte (3)'
-  if percentage <70: return '9 Punkte (3+)'
-  if percentage <75: return '10 Punkte (2-)'
-  if percentage <80: return '11 Punkte (2)'
-  if percentage <85: return '12 Punkte (2+)'
-  if percentage <90: return '13 Punkte (1-)'
-  if percentage <95: return '14 Punkte (1)'
-  return '15 Punkte (1+)'"""
+  thresholds, marks = scheme
+  return marks[bisect.bisect_right(thresholds, percentage)]
 
 
-def variants(template, args=None):
-  """
-  generates variants of a tex file from a given template.
-  Eventual parameters can passed as command line arguments.
-  """
+def compute_marks(percentages, scheme=SCHEMES['noten']):
+  """computes the marks of a whole column of percentages in one call"""
+  thresholds, marks = scheme
+  return [marks[k] for k in map(functools.partial(bisect.bisect_right, thresholds), percentages)]
 
-  # read the CSV doc
-  with open("../" + args.csvfile, encoding=args.encoding, newline='') as csvfile:
+
+def read_rows(file_name, encoding):
+  """reads the CSV doc lazily: yields the stripped column headers first, then the other lines one by one."""
+
+  with open(file_name, encoding=encoding, newline='') as csvfile:
     reader = csv.reader(csvfile, delimiter=';')
     
     # read the first line containing the column headers, and strip them.
-    col_names = next(reader)
-    col_names = [s.strip() for s in col_names]
+    yield [s.strip() for s in next(reader)]
+
+    # read other lines. Skip empty lines.
+    for line in reader:
+      if len(line) and line[0]:
+        yield line
 
-    # read other lines and store them in a list. Skip empty lines.
-    lines = [line for line in reader if len(line) and line[0]]
+
+def parse_header(col_names):
+  """
+  parses the column headers into a schema, a list of Column tuples, and computes the maximum score.
+  The regular expressions are matched here once per column, so the rows need no regex work.
+  """
+
+  schema = []
+  block = None
+  for col_name in col_names:
+    is_name = bool(re.match(STUDENT_NAME, col_name))
+    is_start = bool(re.match(START_OF_BLOCK, col_name))
+    is_end = bool(re.match(END_OF_BLOCK, col_name))
+
+    # the table line for the start of a block: project name and date
+    k = col_name.rfind(" ")
+    heading = "\\\\\\hline\n" + col_name[:k] + "&" + col_name[k+1:]
+    if is_start:
+      block = col_name[:k]
+
+    # the maximum score for the end of a block
+    suffix = ''
+    points = None
+    if 'Zusatz' in col_name:
+      suffix = "/ *"
+    elif NON_NUMBER.sub('', col_name):
+      points = int(NON_NUMBER.sub('', col_name))
+      suffix = "/ " + str(points)
+
+    schema.append(Column(is_name, is_start, is_end, heading, suffix, block, points))
 
   # compute maximum score
   max_score = 0
@@ -109,89 +183,268 @@ def variants(template, args=None):
     if s[:6] == "Punkte":
       max_score += int(NON_NUMBER.sub('', s))
 
-  # iterate on the lines
-  for line in lines:
-
-    # init content to be inserted in the tex doc
-    content = ''
-
-    # count the student's score
-    total_score = 0
-
-    # name of the student
-    student_name = ''
-
-    # iterate on cells in line and synchronously on column names
-    col_names_iterator = iter(col_names)
-    for cell in line:
-      col_name = next(col_names_iterator)
-
-      # preprocessing: remove whitespace and escape special characters for latex
-      cell = cell.strip().replace('&', '\\&').replace('_', '\\_')
-
-      # if cell is part of the student's name, then concatenate and continue
-      if re.match(STUDENT_NAME, col_name):
-        student_name = student_name + cell + ' '
-        continue
-
-      # if start of block: add table line, project name and date
-      if re.match(START_OF_BLOCK, col_name):
-        content += "\\\\\\hline\n"
-        k = col_name.rfind(" ")
-        content = content + col_name[:k] + "&" + col_name[k+1:]
-
-      # if at the end or at the start, add colum marker. Add "Team:" if necessary
-      if re.match(START_OF_BLOCK, col_name) or re.match(END_OF_BLOCK, col_name):
-        content += '&'
-      elif cell:
-        content += ' Team: '
-
-      # Add cell content. In case of a missing score: add '-'
-      content += cell
-      if re.match(END_OF_BLOCK, col_name) and cell == '':
-        content += '-'
-      
-      # if end of block: add maximum score
-      if re.match(END_OF_BLOCK, col_name):
-        if 'Zusatz' in col_name:
-          content += "/ *"
-        elif NON_NUMBER.sub('', col_name):
-          content += "/ " + NON_NUMBER.sub('', col_name)
-
-      # if the cell contains a score, add it to the total score
-      if re.match(SCORE, col_name) and NON_NUMBER.sub('', cell):
-        total_score += int(NON_NUMBER.sub('', cell))
-
-    # compute percentage
-    percentage = total_score * 100 // max_score
-    
+  return schema, max_score
+
+
+def _escape(cell):
+  """removes whitespace and escapes special characters for latex"""
+  return cell.strip().replace('&', '\\&').replace('_', '\\_')
+
+
+def row_name(schema, line):
+  """returns the name of the student in a line of the CSV doc, without parsing the other cells"""
+  return ''.join(_escape(cell) + ' ' for column, cell in zip(schema, line) if column.is_name)
+
+
+def parse_row(schema, max_score, line):
+  """
+  scores a student, given as a line of the CSV doc.
+  Returns a dict with the student's name, the table content for the tex doc,
+  the score of each block (None if empty), the total score and the percentage.
+  """
+
+  # init content to be inserted in the tex doc
+  content = []
+
+  # the student's score, per block and in total
+  scores = []
+  total_score = 0
+
+  # iterate on cells in line and synchronously on the columns
+  for column, cell in zip(schema, line):
+
+    # the cells of the student's name are handled by row_name
+    if column.is_name:
+      continue
+
+    # preprocessing: remove whitespace and escape special characters for latex
+    cell = _escape(cell)
+
+    # if start of block: add table line, project name and date
+    if column.is_start:
+      content.append(column.heading)
+
+    # if at the end or at the start, add colum marker. Add "Team:" if necessary
+    if column.is_start or column.is_end:
+      content.append('&')
+    elif cell:
+      content.append(' Team: ')
+
+    # Add cell content
+    content.append(cell)
+
+    # if end of block: add the maximum score. In case of a missing score: add '-'.
+    # If the cell contains a score, add it to the total score.
+    if column.is_end:
+      if cell == '':
+        content.append('-')
+      content.append(column.suffix)
+      digits = ''.join(filter(str.isdecimal, cell))
+      scores.append(int(digits) if digits else None)
+      if digits:
+        total_score += int(digits)
+
+  # compute percentage
+  percentage = total_score * 100 // max_score
+
+  return {'name': row_name(schema, line), 'content': ''.join(content), 'scores': scores,
+    'total_score': total_score, 'percentage': percentage,
+    'row_hash': hashlib.sha256('\0'.join(line).encode()).hexdigest()}
+
+
+def read_students(file_name, encoding, student_name=''):
+  """
+  reads the CSV doc and returns the schema, the maximum score and a generator of the scored students.
+  The students are parsed lazily, so only one line is held in memory at a time.
+  Only the students whose name contains student_name are parsed, the others are skipped by their name cells.
+  """
+
+  lines = read_rows(file_name, encoding)
+  schema, max_score = parse_header(next(lines))
+  return schema, max_score, (parse_row(schema, max_score, line) for line in lines
+    if not student_name or student_name in row_name(schema, line))
+
+
+def cohort_statistics(schema, max_score, students, scheme=SCHEMES['noten']):
+  """
+  aggregates the scores of all students, without any LaTeX.
+  Returns a dict with a row per student, the statistics per block (mean, median, min and max of the scores given),
+  the distribution of the marks and the mean and median percentage.
+  """
+
+  students = list(students)
+  blocks = [c for c in schema if c.is_end]
+
+  # per student, with the marks of all students computed at once
+  marks = compute_marks([s['percentage'] for s in students], scheme)
+  rows = [{'name': s['name'].strip(), 'total_score': s['total_score'], 'max_score': max_score,
+    'percentage': s['percentage'], 'mark': mark} for s, mark in zip(students, marks)]
+
+  # per block, over the students with a score
+  assignments = []
+  for k, column in enumerate(blocks):
+    scores = [s['scores'][k] for s in students if k < len(s['scores']) and s['scores'][k] is not None]
+    assignments.append({'assignment': column.block, 'max_score': column.points, 'count': len(scores),
+      'mean': round(statistics.mean(scores), 2) if scores else None,
+      'median': statistics.median(scores) if scores else None,
+      'min': min(scores, default=None), 'max': max(scores, default=None)})
+
+  # distribution of the marks, best mark first
+  counts = collections.Counter(marks)
+  marks = {mark: counts[mark] for mark in reversed(scheme[1]) if mark in counts}
+
+  percentages = [s['percentage'] for s in students]
+  summary = {'students': len(students), 'max_score': max_score,
+    'mean_percentage': round(statistics.mean(percentages), 2) if percentages else None,
+    'median_percentage': statistics.median(percentages) if percentages else None}
+
+  return {'summary': summary, 'students': rows, 'assignments': assignments, 'marks': marks}
+
+
+def export(file_name, stats):
+  """
+  writes the cohort statistics to a JSON file, or to CSV files:
+  the students to file_name, the assignments and the marks to files named after it.
+  """
+
+  if file_name.endswith('.json'):
+    with open(file_name, 'w', encoding='utf8') as file:
+      json.dump(stats, file, indent=2, ensure_ascii=False)
+    return
+
+  base = os.path.splitext(file_name)[0]
+  tables = [(file_name, stats['students']), (base + '.assignments.csv', stats['assignments']),
+    (base + '.marks.csv', [{'mark': mark, 'count': count} for mark, count in stats['marks'].items()])]
+  for table_file, rows in tables:
+    with open(table_file, 'w', encoding='utf8', newline='') as file:
+      if rows:
+        writer = csv.DictWriter(file, fieldnames=list(rows[0]), delimiter=';')
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def variants(template, args=None):
+  """
+  generates variants of a tex file from a given template.
+  Eventual parameters can passed as command line arguments.
+  The CSV doc is streamed, so only one line is held in memory at a time.
+  The paths are relative to the parent dir, as create_pdf_series runs the variants in a temp dir.
+  """
+
+  # the grading scheme, eventually from a file
+  scheme = getattr(args, 'scheme', 'noten')
+  if scheme not in SCHEMES:
+    scheme = os.path.join("..", scheme)
+
+  # only the students asked for are parsed and rendered
+  schema, max_score, students = read_students(os.path.join("..", args.csvfile), args.encoding, args.studentname)
+  yield from render(template, max_score, students, load_scheme(scheme))
+
+
+def render(template, max_score, students, scheme=SCHEMES['noten']):
+  """generates the tex docs of the given students, with the marks of the grading scheme"""
+
+  # parse the tex document once
+  tex_template = util.Template(template)
+
+  for student in students:
+
     # insert individual values into the tex document
-    tex_doc = template
-    tex_doc = tex_doc.replace('(STUDENT_NAME)', student_name)
-    tex_doc = tex_doc.replace('(CONTENT)', content)
-    tex_doc = tex_doc.replace('(TOTAL_SCORE)', str(total_score))
-    tex_doc = tex_doc.replace('(MAX_SCORE)', str(max_score))
-    tex_doc = tex_doc.replace('(PERCENTAGE)', str(percentage))
-    tex_doc = tex_doc.replace('(MARK)', compute_mark(percentage))
+    yield tex_template.render({
+      '(STUDENT_NAME)': student['name'],
+      '(CONTENT)': student['content'],
+      '(TOTAL_SCORE)': student['total_score'],
+      '(MAX_SCORE)': max_score,
+      '(PERCENTAGE)': student['percentage'],
+      '(MARK)': compute_mark(student['percentage'], scheme)})
 
-    # if want to print scores for this student, yield
-    if args.studentname in student_name:
-       yield tex_doc
 
+def pdf_name(student_name):
+  """returns a file name for the pdf of a student, without the characters not allowed in file names"""
+  return ''.join(c for c in student_name.strip().replace('\\', '') if c not in '/:*?"<>|') + '.pdf'
 
-def main():
 
-  # parse command line arguments 
-  args = parse_args()
+def build_directory(args, template):
+  """
+  creates a pdf per student in args.directory.
+  Only the students whose line changed since the last run, or whose pdf is missing, are compiled.
+  The hashes of the lines are kept in rows.json in the directory.
+  """
+
+  # the hashes of the last run
+  os.makedirs(args.directory, exist_ok=True)
+  state_file = os.path.join(args.directory, 'rows.json')
+  try:
+    with open(state_file) as file:
+      state = json.load(file)
+  except FileNotFoundError:
+    state = {}
+
+  # the tex doc, the column headers and the grading scheme concern all students
+  scheme = load_scheme(args.scheme)
+  schema, max_score, students = read_students(args.csvfile, args.encoding, args.studentname)
+  common = hashlib.sha256((template + repr(schema) + str(max_score) + repr(scheme)).encode()).hexdigest()
+
+  # index the students by their pdf file, and keep those that changed
+  hashes = {}
+  changed = {}
+  for student in students:
+    file_name = os.path.join(args.directory, pdf_name(student['name']))
+    if file_name in hashes:
+      raise ValueError('Two students named ' + student['name'])
+    hashes[file_name] = hashlib.sha256((common + student['row_hash']).encode()).hexdigest()
+    if state.get(os.path.basename(file_name)) != hashes[file_name] or not os.path.exists(file_name):
+      changed[file_name] = student
+
+  # compile the changed students only
+  if changed:
+    util.create_pdf_series(template, args, render(template, max_score, changed.values(), scheme),
+      file_names=list(changed))
+  print('{} of {} transcripts rebuilt in {}'.format(len(changed), len(hashes), args.directory))
+
+  # remember the hashes, also of the students not asked for this time
+  state.update((os.path.basename(f), h) for f, h in hashes.items())
+  with open(state_file, 'w') as file:
+    json.dump(state, file, indent=2, ensure_ascii=False)
+
+
+def build(args):
+  """exports the scores, if requested, then reads the tex doc and creates the pdf series"""
+
+  # the export only needs the CSV doc
+  if getattr(args, 'export', None):
+    export(args.export, cohort_statistics(*read_students(args.csvfile, args.encoding),
+      load_scheme(getattr(args, 'scheme', 'noten'))))
+  if getattr(args, 'no_pdf', False):
+    return
 
   # read the tex doc
   template = util.read_template(os.path.realpath(__file__))
 
+  # a pdf per student
+  if getattr(args, 'directory', None):
+    build_directory(args, template)
+    return
+
   # create pdf series
   util.create_pdf_series(template, args, variants(template, args))
 
+
+def main():
+
+  # parse command line arguments 
+  args = parse_args()
+
+  # create pdf series
+  build(args)
+
   # open the combined pdf containing all variants
-  os.system('open ' + args.output)
+  if not args.no_pdf and not args.directory:
+    os.system('open ' + args.output)
+
+  # rebuild when the tex doc or the CSV file changes
+  if args.watch:
+    util.watch([os.path.realpath(__file__), args.csvfile], lambda: build(args))
 
 # execute only if run as a script
 if __name__ == "__main__":
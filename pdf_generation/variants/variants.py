@@ -18,6 +18,10 @@ How to use:
 example:
 >> python3 variants.py -v 10
 
+To get an answer key, run with -k. The values of each variant are written to <output>.key.csv,
+and a key sheet is compiled to <output>.key.pdf. The marker (VARIANT) prints the variant number.
+Runs with the same seed (-s) produce the same variants.
+
 Prerequisits:
 - latex
 - python 3.x
@@ -31,6 +35,10 @@ import subprocess
 import PyPDF2
 import time
 import shutil
+import math
+import random
+import csv
+import itertools
 
 # symlink to library contained in repository
 from lib import util
@@ -45,14 +53,89 @@ def parse_args():
                    help='the number of variants to be created')
 	parser.add_argument('-o', '--output', default=__file__+'.pdf',
                    help='the output file name')
+	parser.add_argument('-s', '--seed', default=0, type=int,
+                   help='the seed for the selection of the variants')
+	parser.add_argument('-d', '--differ', action='store_true',
+                   help='adjacent variants differ in every replacement')
+	parser.add_argument('-k', '--key', action='store_true',
+                   help='write the replacements of each variant to <output>.key.csv and a key sheet to <output>.key.pdf')
+	util.add_series_arguments(parser)
 	return parser.parse_args()
 
 
-def variants(tex_doc, args):
+def combinations(radices, seed):
+	""" Lazily enumerates all combinations of indexes, one index per slot, in a seeded order
+
+	radices -- the number of choices for each slot
+	seed -- the seed of the order
+
+	As with l[i % len(l)], each slot cycles through all of its choices, in a seeded order per slot.
+	Once the cycles repeat, after the least common multiple of the radices, the slots are shifted
+	against each other, so every combination appears exactly once.
+
+	Two shifts give the same cycle, if they differ by a multiple of the steps taken so far in every slot.
+	So the shift of a slot only ranges over the gcd of its radix and the lcm of the radices before,
+	and each cycle is enumerated once, without remembering the combinations seen.
+	"""
+
+	# a seeded order of the choices of each slot
+	rnd = random.Random(seed)
+	orders = [rnd.sample(range(r), r) for r in radices]
+	period = math.lcm(*radices)
+
+	# the distinct shifts of each slot. The first slot is never shifted
+	ranges = []
+	steps = 1
+	for r in radices:
+		ranges.append(range(math.gcd(steps, r)))
+		steps = math.lcm(steps, r)
+
+	for shifts in itertools.product(*ranges):
+		for i in range(period):
+			yield tuple(order[(i + s) % len(order)] for order, s in zip(orders, shifts))
+
+def select(candidates, n, accept=None):
+	""" Yields n of the candidates, each one accepted by accept(previous, candidate)
+
+	candidates -- an iterator of distinct candidates
+	n -- the number of candidates to be selected
+	accept -- a function checking a candidate against the previously selected one, or None
+
+	Rejected candidates are kept and tried again for the next places, so none gets lost.
+	"""
+
+	previous = None
+	rejected = []
+	for _ in range(n):
+
+		# first try the candidates rejected before, then new ones
+		for k, candidate in enumerate(rejected):
+			if previous is None or accept is None or accept(previous, candidate):
+				del rejected[k]
+				break
+		else:
+			for candidate in candidates:
+				if previous is None or accept is None or accept(previous, candidate):
+					break
+				rejected.append(candidate)
+			else:
+				raise ValueError('Can not find {} variants satisfying the constraints'.format(n))
+
+		previous = candidate
+		yield candidate
+
+def differ(radices):
+	""" Returns a constraint for select: two combinations differ in every slot with more than one choice """
+
+	slots = [k for k, r in enumerate(radices) if r > 1]
+	return lambda c, d: all(c[k] != d[k] for k in slots)
+
+def variants(tex_doc, args, key=None):
 	""" Generates variants of a tex documents
 
 	tex_doc -- the tex document as a string
 	args -- the command line options as a Namespace object
+	key -- a list, or None. The number and the replacements of each variant are appended as a tuple.
 	"""
 
 	# additional contents for the replacements dictionary
@@ -68,38 +151,105 @@ def variants(tex_doc, args):
 		'(2D)': [a + '\\neq-' + str(b) for a in "xyz" for b in range (1001, 1010)]
 	}
 
-	# loop n times
-	for i in range(args.variants):
+	# parse the tex document once
+	template = util.Template(tex_doc)
 
-		# create a variant of the tex document
-		# don't need to clone here, as replace will generate a copy
-		variant = tex_doc
+	# there are only so many distinct variants
+	keys = list(replacements)
+	radices = [len(replacements[key]) for key in keys]
+	if args.variants > math.prod(radices):
+		raise ValueError('Can not create more than {} distinct variants'.format(math.prod(radices)))
 
-		# iterate on the replacement keys
-		for key in replacements:
+	# select distinct combinations of the replacements, eventually with adjacent ones differing in every slot
+	accept = differ(radices) if args.differ else None
+	selected = select(combinations(radices, args.seed), args.variants, accept)
+	for number, combination in enumerate(selected, 1):
 
-			# determine the actual replacement, then replace
-			l = replacements[key]
-			replacement = l[i % len(l)]
-			variant = variant.replace(key, replacement)
+		# determine the actual replacements
+		values = {k: replacements[k][i] for k, i in zip(keys, combination)}
 
-		# yield the generated variant
-		yield variant
+		# remember them for the answer key
+		if key is not None:
+			key.append((number, values))
 
-def main():
+		# yield the generated variant, with its number if the template prints it
+		if '(VARIANT)' in template.placeholders:
+			values = {**values, '(VARIANT)': number}
+		yield template.render(values)
 
-	# parse command line arguments
-	args = parse_args()
+def key_sheet(tex_doc, key, seed, rows_per_page=30):
+	""" Creates a tex document listing the replacements of each variant
+
+	tex_doc -- the tex document as a string. Its preamble is used for the key sheet.
+	key -- a list of tuples (number, values), as filled by variants
+	seed -- the seed the variants were selected with
+	rows_per_page -- the number of variants in one table
+	"""
+
+	keys = list(key[0][1]) if key else []
+	columns = 'r|' + 'l' * len(keys)
+	header = 'Variante & ' + ' & '.join(k.strip('()') for k in keys) + '\\\\\n\\hline\n'
+
+	# one row per variant, values in math mode
+	rows = ['{} & {}\\\\\n'.format(number, ' & '.join('$' + values[k] + '$' for k in keys))
+		for number, values in key]
+
+	# one table per page
+	tables = []
+	for k in range(0, len(rows), rows_per_page):
+		tables.append('\\begin{tabular}{' + columns + '}\n' + header + ''.join(rows[k:k + rows_per_page])
+			+ '\\end{tabular}\n')
+
+	return (util.split_preamble(tex_doc)[0] + '\\begin{document}\n'
+		+ '\\noindent{\\large\\bf Lösungsschlüssel}\\hfill Seed: ' + str(seed) + '\\\\\n'
+		+ '\\hrule\n\\medskip\n\n' + '\\newpage\n'.join(tables) + '\\end{document}\n')
+
+def write_key(file_name, key, seed):
+	""" Writes the replacements of each variant to a CSV file
+
+	file_name -- the name of the CSV file
+	key -- a list of tuples (number, values), as filled by variants
+	seed -- the seed the variants were selected with
+	"""
+
+	keys = list(key[0][1]) if key else []
+	with open(file_name, 'w', newline='') as file:
+		writer = csv.writer(file, delimiter=';')
+		writer.writerow(['variant', 'seed'] + [k.strip('()') for k in keys])
+		for number, values in key:
+			writer.writerow([number, seed] + [values[k] for k in keys])
+
+def build(args):
+	"""reads the tex doc and creates the PDF series"""
 
 	# read the tex doc
 	template = util.read_template(__file__)
 
+	# create PDF series. The replacements of each variant are collected for the answer key.
+	key = [] if args.key else None
+	util.create_pdf_series(template, args, variants(template, args, key))
+
+	# write the answer key. The key sheet is a pdf of its own, so it can't be handed out with the variants.
+	if key is not None:
+		write_key(args.output + '.key.csv', key, args.seed)
+		key_args = argparse.Namespace(**{**vars(args), 'output': args.output + '.key.pdf'})
+		util.create_pdf_series(template, key_args, iter([key_sheet(template, key, args.seed)]))
+
+def main():
+
+	# parse command line arguments
+	args = parse_args()
+
 	# create PDF series
-	util.create_pdf_series(template, args, variants(template, args))
+	build(args)
 
 	# open the combined pdf containing all variants
 	os.system('open ' + args.output)
 
+	# rebuild when the tex doc changes
+	if args.watch:
+		util.watch([__file__], lambda: build(args))
+
 # execute only if run as a script
 if __name__ == "__main__":
     main()
@@ -143,7 +293,7 @@ r"""
 \begin{center}
 {\large\bf Fake Test zur letzten Stunde}
 \end{center}
-Gymnasium Tiergarten\hfill 2. Mai 2017\\
+Gymnasium Tiergarten\hfill Variante (VARIANT), 2. Mai 2017\\
 Klasse 9b, Mathematik\hfill Bearbeitungszeit: 15 Minuten
 \begin{center}
 \addpoints\gradetable[h][questions] 
@@ -2,7 +2,7 @@
 # -*- coding: utf-8 -*-
 
 """
-This skript creates two variants of a tex file by and compiles them to a single pdf.
+This skript creates variants A, B, ... of a tex file and compiles them to a single pdf.
 How to use:
 
 1. edit you tex file and include variants
@@ -10,10 +10,15 @@ How to use:
   - *** delimits variants A and B
   - *B* marks the end of variant B
   - example: *A*it's night time in Berlin***it's day time in Berlin*B*
+  - more variants are delimited by further ***, the end marker is the letter of the last variant:
+    *A*Berlin***Hamburg***München*C* creates the variants A, B and C
 
 2. Run the script
 $ python3 variants_ab test_ab.tex
 
+Files included with \\input or \\include are expanded as well, so a long test can be split into parts.
+Images and other files the document refers to are taken from the directory of the tex file.
+
 Prerequisits:
 - latex
 - python 3.x
@@ -28,6 +33,7 @@ import PyPDF2
 import time
 import shutil
 import re
+import hashlib
 import sys
 
 # a symlink to lib is contained in the git repository
@@ -40,46 +46,225 @@ def parse_args():
 		description='Generates variants from an embedded tex doc and compiles them to a combined PDF.')
 	parser.add_argument('texfile', help='the tex file where the two variants shall be created for')
 	parser.add_argument('-o', '--output', help='the output file name')
+	util.add_series_arguments(parser)
 	return parser.parse_args()
 
 
-def variants(tex_doc):
-	""" Generates variants of a tex documents
+# the markers: *A* starts a group of variants, *** delimits two variants, *B*, *C*, ... ends the group
+MARKER = re.compile(r"\*(?:([A-Z])|\*)\*")
+
+# included files, and the start of a comment
+INCLUDE = re.compile(r"\\(input|include)\s*\{([^}]*)\}")
+COMMENT = re.compile(r"(?<!\\)%")
+
+# files a document refers to, such as images, and the extensions latex tries for graphics without one
+RESOURCE = re.compile(r"\\(?:includegraphics|includepdf|lstinputlisting|verbatiminput)\*?\s*(?:\[[^\]]*\]\s*)?\{([^}]*)\}")
+GRAPHICS_EXTENSIONS = ('.pdf', '.png', '.jpg', '.jpeg', '.eps')
+
+
+def expand(tex_doc, name='<tex>'):
+	""" Expands the variant markers of a tex document in a single pass
 
 	tex_doc -- the tex document as a string
+	name -- the name of the document in error messages
+
+	Returns a list with one document per variant. The closing marker of a group is the letter of its last variant,
+	e.g. *A*...***...***...*C* for three variants, and all groups must have the same number of variants.
+	A document without markers is returned as the only element.
+	Raises ValueError with the line and column of the first inconsistent marker.
 	"""
-	
-	# for any of the three markers, create an iterator of its matches
-	iter1 = re.finditer(r"\*A\*", tex_doc)
-	iter2 = re.finditer(r"\*\*\*", tex_doc)
-	iter3 = re.finditer(r"\*B\*", tex_doc)
-
-	# now parallely iterate on all matches 
-	index_of_last_match = -1
-	while True:
-		matches = (next(iter1, None), next(iter2, None), next(iter3, None))
-
-		# if all iterators exhausted simultaneously: we are fine
-		if matches == (None,)*3:
-			break
-
-		# if any iterator exhausted before the others: that's a problem
-		assert not None in matches, "Inconsistent number of markers. Please check tex source."
-
-		# check that indices are ascending
-		assert index_of_last_match < matches[0].start(0), "New Variant started before old one ended"
-		assert matches[0].start(0) < matches[1].start(0), "Variant stated with *** instead of *A*"
-		assert matches[1].start(0) < matches[2].start(0), "Variant ended before ***"
-
-	l= re.findall(r"\*\*\*", tex_doc)
-	l=re.search(r"\*\*\*", tex_doc)
-	l=[r for r in re.finditer(r"\*\*\*", tex_doc)]
-	print(l)
-
-	regex_a = re.compile(r"\*A\*(.*?)\*\*\*.*?\*B\*", re.DOTALL)
-	regex_b = re.compile(r"\*A\*.*?\*\*\*(.*?)\*B\*", re.DOTALL)
-	yield re.sub(regex_a, r'\1', tex_doc)
-	yield re.sub(regex_b, r'\1', tex_doc)
+
+	# the text between the markers, either a string shared by all variants or a list of alternatives
+	segments = []
+	group = None
+	count = None
+	pos = 0
+	line, line_start = 1, 0
+
+	for match in MARKER.finditer(tex_doc):
+
+		# keep track of the position for error messages
+		newlines = tex_doc.count('\n', line_start, match.start())
+		if newlines:
+			line += newlines
+			line_start = tex_doc.rfind('\n', line_start, match.start()) + 1
+		where = '{}:{}:{}: '.format(name, line, match.start() - line_start + 1)
+
+		text = tex_doc[pos:match.start()]
+		pos = match.end()
+		letter = match.group(1)
+
+		if group is None:
+			if letter != 'A':
+				raise ValueError(where + '{} outside of a variant group, expected *A*'.format(match.group(0)))
+			segments.append(text)
+			group = []
+			opened = where
+		elif letter is None:
+			group.append(text)
+		elif letter == 'A':
+			raise ValueError(where + 'New variant group started before the previous one ended')
+		else:
+			group.append(text)
+			expected = chr(ord('A') + len(group) - 1)
+			if len(group) < 2:
+				raise ValueError(where + 'Variant group ended before ***')
+			if letter != expected:
+				raise ValueError(where + '*{}* ends a group of {} variants, expected *{}*'.format(
+					letter, len(group), expected))
+			if count is not None and len(group) != count:
+				raise ValueError(where + 'Group of {} variants, but the previous groups have {}'.format(
+					len(group), count))
+			count = len(group)
+			segments.append(group)
+			group = None
+
+	if group is not None:
+		raise ValueError(opened + 'Variant group not ended. Please check tex source.')
+	segments.append(tex_doc[pos:])
+
+	# join the segments once per variant
+	if count is None:
+		return [tex_doc]
+	return [''.join(s if isinstance(s, str) else s[k] for s in segments) for k in range(count)]
+
+def _commented(tex_doc, pos):
+	""" Checks whether a position of a tex document is behind a % on its line """
+
+	line = tex_doc[tex_doc.rfind('\n', 0, pos) + 1:pos]
+	return COMMENT.search(line) is not None
+
+def _find_include(root_dir, name, command):
+	""" Returns the path of an included file like latex finds it, or None if it isn't part of the project """
+
+	path = os.path.join(root_dir, name)
+	candidates = [path + '.tex'] if command == 'include' else [path + '.tex', path]
+	for candidate in candidates:
+		if os.path.isfile(candidate):
+			return os.path.abspath(candidate)
+	return None
+
+def _find_resources(root_dir, name):
+	""" Returns the paths of the files a reference may mean, relative to root_dir. Files outside of it are left to latex. """
+
+	candidates = [name] + [name + ext for ext in GRAPHICS_EXTENSIONS]
+	paths = [os.path.normpath(c) for c in candidates if os.path.isfile(os.path.join(root_dir, c))]
+	return [p for p in paths if not os.path.isabs(p) and not p.startswith(os.pardir)]
+
+def _count(lengths, name):
+	""" Returns the common number of variants of a file and its includes """
+
+	counts = set(n for n in lengths if n > 1)
+	if len(counts) > 1:
+		raise ValueError('{}: the file and its includes have different numbers of variants: {}'.format(
+			name, ', '.join(str(n) for n in sorted(counts))))
+	return counts.pop() if counts else 1
+
+class Sources:
+	""" The tex files of a document, following \\input and \\include
+
+	The markers are expanded file by file. Each expansion is cached by the modification time
+	and the hash of the file, so a rebuild only expands the files that changed.
+	Files the document refers to, such as images, are collected as resources.
+	"""
+
+	def __init__(self):
+		self.files = {}
+		self.dependencies = []
+		self.resources = []
+
+	def load(self, file_name):
+		""" Returns the variants of a tex file with all includes resolved
+
+		The paths of all files read and referred to are listed in dependencies. The resources are the files
+		referred to, relative to the directory of the file. Includes are found relative to it as well, as latex does.
+		"""
+
+		del self.dependencies[:]
+		del self.resources[:]
+		self.resolved = {}
+		documents = self.resolve(os.path.abspath(file_name), os.path.dirname(os.path.abspath(file_name)))
+
+		# forget the files that are not included any more
+		self.files = {path: self.files[path] for path in self.dependencies if path in self.files}
+		return documents
+
+	def expand(self, path):
+		""" Returns the expanded variants of a single file, without resolving its includes """
+
+		mtime = os.stat(path).st_mtime_ns
+		entry = self.files.get(path)
+		if entry and entry[0] == mtime:
+			return entry[2]
+
+		# the file was touched, but it's expanded again only if its content changed
+		with open(path, 'rb') as file:
+			data = file.read()
+		digest = hashlib.sha256(data).hexdigest()
+		if entry and entry[1] == digest:
+			documents = entry[2]
+		else:
+			documents = expand(data.decode(), os.path.relpath(path))
+		self.files[path] = (mtime, digest, documents)
+		return documents
+
+	def resolve(self, path, root_dir, parents=()):
+		""" Returns the variants of a file with the includes replaced by the matching variants of the included files """
+
+		if path in parents:
+			raise ValueError('{}: the file includes itself'.format(os.path.relpath(path)))
+		if path in self.resolved:
+			return self.resolved[path]
+		self.dependencies.append(path)
+
+		# split each variant at its includes. Files not found, e.g. those of packages, are left to latex.
+		documents = []
+		lengths = []
+		for doc in self.expand(path):
+			segments = []
+			pos = 0
+			for match in INCLUDE.finditer(doc):
+				included = _find_include(root_dir, match.group(2).strip(), match.group(1))
+				if included is None or _commented(doc, match.start()):
+					continue
+				variants = self.resolve(included, root_dir, parents + (path,))
+				if match.group(1) == 'include':
+					variants = ['\\clearpage\n' + v + '\n\\clearpage\n' for v in variants]
+				segments += [doc[pos:match.start()], variants]
+				lengths.append(len(variants))
+				pos = match.end()
+			segments.append(doc[pos:])
+			documents.append(segments)
+
+			# the images and the like of this file
+			for match in RESOURCE.finditer(doc):
+				if not _commented(doc, match.start()):
+					for name in _find_resources(root_dir, match.group(1).strip()):
+						if name not in self.resources:
+							self.resources.append(name)
+							self.dependencies.append(os.path.join(root_dir, name))
+		lengths.append(len(documents))
+
+		# join the segments once per variant. Files without markers are the same in all variants.
+		count = _count(lengths, os.path.relpath(path))
+		self.resolved[path] = [''.join(s if isinstance(s, str) else s[k % len(s)]
+			for s in documents[k % len(documents)]) for k in range(count)]
+		return self.resolved[path]
+
+def build(args, sources=None):
+	"""reads the tex doc and the files it includes and creates the PDF series"""
+
+	# read and expand the tex doc
+	sources = sources or Sources()
+	documents = sources.load(args.texfile)
+
+	# without markers, there are still the variants A and B
+	if len(documents) == 1:
+		documents *= 2
+
+	# create PDF series. The images and the like the document refers to are copied from the directory of the tex doc.
+	src_dir = os.path.dirname(os.path.abspath(args.texfile))
+	util.create_pdf_series(documents[0], args, iter(documents), src_dir, resource_names=sources.resources)
 
 def main():
 
@@ -88,16 +273,17 @@ def main():
 	if not args.output:
 		args.output = args.texfile.replace('.tex','.pdf')
 
-	# read the tex doc
-	with open(args.texfile, 'r') as file:
-		tex = ''.join(file.readlines())
-
 	# create PDF series
-	util.create_pdf_series(tex, args, variants(tex))
+	sources = Sources()
+	build(args, sources)
 
 	# open the combined pdf containing all variants
 	os.system('open ' + args.output)
 
+	# rebuild when the tex doc, one of its includes or one of the files it refers to changes
+	if args.watch:
+		util.watch(sources.dependencies, lambda: build(args, sources))
+
 # execute only if run as a script
 if __name__ == "__main__":
     main()